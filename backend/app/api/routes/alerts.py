@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from app.services.auth import AuthenticatedUser, get_current_user
+from app.services.supabase import get_supabase_client
+
+router = APIRouter()
+
+@router.get("")
+def list_alerts(
+    limit: int = Query(50, ge=1, le=500),
+    user: AuthenticatedUser = Depends(get_current_user),
+):
+    """Most recent budget/anomaly alerts raised during imports (see app/services/analytics.py)."""
+    supabase = get_supabase_client(user.access_token)
+    response = (
+        supabase.table('alerts')
+        .select('*')
+        .eq('user_id', user.user_id)
+        .order('created_at', desc=True)
+        .limit(limit)
+        .execute()
+    )
+    return response.data
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.services.auth import AuthenticatedUser, get_current_user
+from app.services.category_cache import get_category_lookup
+from app.services.supabase import get_supabase_client
+from app.services.transaction_pages import PAGE_SIZE, iter_transaction_pages
+
+router = APIRouter()
+
+EXPORT_COLUMNS = (
+    "id",
+    "booked_at",
+    "amount",
+    "currency",
+    "amount_chf",
+    "fx_rate",
+    "description",
+    "purpose",
+    "merchant",
+    "counterparty",
+    "payment_method",
+    "direction",
+    "iban",
+    "category",
+)
+
+_SELECT = ", ".join(col for col in EXPORT_COLUMNS if col != "category") + ", categories(name)"
+
+_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _iter_pages(supabase, user_id: str, **filters) -> Iterator[list[dict]]:
+    for rows in iter_transaction_pages(supabase, user_id, _SELECT, page_size=PAGE_SIZE, **filters):
+        for row in rows:
+            category = row.pop('categories', None)
+            row['category'] = category.get('name') if category else None
+        yield rows
+
+
+def _csv_chunks(pages: Iterator[list[dict]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(pages: Iterator[list[dict]]) -> Iterator[str]:
+    for rows in pages:
+        yield "".join(
+            json.dumps({col: row.get(col) for col in EXPORT_COLUMNS}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+def _parquet_chunks(pages: Iterator[list[dict]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("booked_at", pa.string()),
+        ("amount", pa.float64()),
+        ("currency", pa.string()),
+        ("amount_chf", pa.float64()),
+        ("fx_rate", pa.float64()),
+        ("description", pa.string()),
+        ("purpose", pa.string()),
+        ("merchant", pa.string()),
+        ("counterparty", pa.string()),
+        ("payment_method", pa.string()),
+        ("direction", pa.string()),
+        ("iban", pa.string()),
+        ("category", pa.string()),
+    ])
+    sink = io.BytesIO()
+    # One row group per page; the bytes written so far are flushed after each.
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in pages:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+@router.get("/transactions")
+def export_transactions(
+    format: str = Query("csv"),  # csv | ndjson | parquet
+    iban: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    category: Optional[str] = Query(None),  # category name
+    user: AuthenticatedUser = Depends(get_current_user),
+):
+    if format not in _MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{format}'. Must be one of: {', '.join(sorted(_MEDIA_TYPES))}"
+        )
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+
+    supabase = get_supabase_client(user.access_token)
+
+    category_id = None
+    if category:
+        category_id = get_category_lookup(user.user_id, supabase).ids_by_name.get(category.strip().lower())
+        if not category_id:
+            raise HTTPException(status_code=400, detail=f"Unknown category '{category}'")
+
+    pages = _iter_pages(
+        supabase, user.user_id,
+        iban=iban, date_from=date_from, date_to=date_to, category_id=category_id,
+    )
+    chunks = {"csv": _csv_chunks, "ndjson": _ndjson_chunks, "parquet": _parquet_chunks}[format](pages)
+
+    return StreamingResponse(
+        chunks,
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Path, Query
+from app.services.auth import AuthenticatedUser, get_current_user
+from app.services.supabase import get_supabase_client
+from app.services.tax_deductions import format_summary, get_summary
+
+router = APIRouter()
+
+@router.get("/{tax_year}")
+def tax_deductions(
+    tax_year: int = Path(..., ge=2000, le=2100),
+    refresh: bool = Query(False),
+    user: AuthenticatedUser = Depends(get_current_user),
+):
+    """Deduction candidates per category for one tax year (see app/services/tax_deductions.py)."""
+    supabase = get_supabase_client(user.access_token)
+    return format_summary(get_summary(supabase, user.user_id, tax_year, refresh=refresh))
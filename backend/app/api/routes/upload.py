@@ -1,42 +1,197 @@
-import os
-import jwt
-from jwt import InvalidTokenError
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Header
+import time
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from app.services.analytics import ImportAnalyzer
+from app.services.auth import AuthenticatedUser, get_current_user
+from app.services.category_cache import get_category_lookup
 from app.services.supabase import get_supabase_client
-from transaction_parser import TransactionParser
+from app.services.tax_deductions import TaxSummaryInvalidator
+from app.services.transaction_parser import TransactionBatch, TransactionParser
 
 router = APIRouter()
 
-def _extract_token(authorization: str) -> str:
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header. Use: Bearer <token>")
-    token = authorization[len("Bearer "):].strip()
-    if not token:
-        raise HTTPException(status_code=401, detail="Missing bearer token")
-    return token
+class _StageTimer:
+    """Collects per-stage durations for the Server-Timing response header."""
 
-def _extract_user_id_from_token(token: str) -> str:
-    # Extract `sub` claim only; Supabase authorization is enforced separately
-    # when requests are executed with `client.postgrest.auth(access_token)`.
-    try:
-        payload = jwt.decode(
-            token,
-            options={"verify_signature": False, "verify_exp": False, "verify_aud": False},
-            algorithms=["HS256", "RS256", "ES256"],
+    def __init__(self):
+        self._last = time.perf_counter()
+        self._stages = []
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self._stages.append((name, (now - self._last) * 1000))
+        self._last = now
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self._stages)
+
+def _observe(hooks: dict, failed: dict, rows: list[dict], errors: list) -> None:
+    """Feed inserted rows to the import hooks; a hook that fails is moved to `failed` for the rest of the import."""
+    for label, hook in list(hooks.items()):
+        try:
+            hook.observe(rows)
+        except Exception as e:
+            failed[label] = hooks.pop(label)
+            errors.append(f"{label} disabled for this import: {str(e)}")
+
+def _import_csv(content_str: str, bank_type: str, user: AuthenticatedUser, timer: _StageTimer) -> dict:
+    """
+    Parse, deduplicate and insert one statement. Every PostgREST call here
+    blocks, so this runs in a worker thread, never on the event loop.
+    """
+    # Token was already verified by SupabaseAuthMiddleware
+    user_id = user.user_id
+    
+    # Get user's client (with RLS)
+    supabase = get_supabase_client(user.access_token)
+    
+    # Load categories for mapping (cached per user)
+    category_lookup = get_category_lookup(user_id, supabase)
+    timer.mark("categories")
+    
+    # Use the same parser workflow that works in manual tests
+    parsed_from_csv = TransactionParser.parse_csv(content_str, bank_type=bank_type)
+    timer.mark("parse")
+    batch = TransactionBatch(user_id)
+    skipped = 0
+    errors = []
+    
+    # Process parsed transactions
+    for row_num, parsed in enumerate(parsed_from_csv, start=2):
+        try:
+            # Map category name to ID
+            parsed.category_id = category_lookup.resolve(parsed.category_name)
+            
+            required_fields = ('amount', 'booked_at', 'import_hash')
+            for field in required_fields:
+                if getattr(parsed, field) in (None, ''):
+                    raise ValueError(f"Missing required field '{field}'")
+            
+            batch.append(parsed, row_num)
+            
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+            continue
+
+    # Check for duplicates, one query per chunk of import hashes
+    batch_size = 100
+    import_hashes = batch.column('import_hash')
+    existing_hashes = set()
+    for i in range(0, len(import_hashes), batch_size):
+        existing_response = (
+            supabase.table('transactions')
+            .select('import_hash')
+            .eq('user_id', user_id)
+            .in_('import_hash', import_hashes[i:i + batch_size])
+            .execute()
         )
-    except InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token format")
+        existing_hashes.update(row['import_hash'] for row in existing_response.data)
+
+    new_rows = []
+    for i, import_hash in enumerate(import_hashes):
+        if import_hash in existing_hashes:
+            skipped += 1
+            continue
+        new_rows.append(i)
+    timer.mark("dedup")
 
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Token does not contain user id")
-    return user_id
+    # Import hooks see every inserted row: spending analytics are updated
+    # without rescanning, cached tax summaries of the touched years are
+    # invalidated. A hook that fails recovers from all inserted rows at the
+    # end, so its tables never silently miss part of the import.
+    hooks = {}
+    failed = {}
+    if new_rows:
+        booked_at = [batch.column('booked_at')[i] for i in new_rows]
+        for label, hook in (
+            ("Analytics", ImportAnalyzer(supabase, user_id)),
+            ("Tax deductions", TaxSummaryInvalidator(supabase, user_id)),
+        ):
+            try:
+                hook.load(booked_at)
+                hooks[label] = hook
+            except Exception as e:
+                failed[label] = hook
+                errors.append(f"{label} disabled for this import: {str(e)}")
+    
+    # Batch insert into Supabase
+    inserted = 0
+    all_inserted = []
+    for i in range(0, len(new_rows), batch_size):
+        chunk = new_rows[i:i + batch_size]
+        payload = batch.insert_payload(chunk)
+        
+        try:
+            insert_response = (
+                supabase.table('transactions')
+                .insert(payload)
+                .execute()
+            )
+            inserted += len(insert_response.data)
+            inserted_rows = payload
+            
+        except Exception as e:
+            # Continue import: retry this batch row-by-row and skip failing rows.
+            errors.append(
+                f"Batch starting at row {batch.row_nums[chunk[0]]} failed, retrying row-by-row: {str(e)}"
+            )
+            inserted_rows = []
+            for j, row in zip(chunk, payload):
+                try:
+                    single_insert = (
+                        supabase.table('transactions')
+                        .insert(row)
+                        .execute()
+                    )
+                    if single_insert.data:
+                        inserted += 1
+                        inserted_rows.append(row)
+                except Exception as row_error:
+                    errors.append(f"Row {batch.row_nums[j]}: insert failed: {str(row_error)}")
+                    continue
+
+        # Only after the insert outcome is settled, so a failing hook can
+        # never send already inserted rows into the row-by-row retry.
+        _observe(hooks, failed, inserted_rows, errors)
+        all_inserted.extend(inserted_rows)
+    timer.mark("insert")
+
+    alerts = 0
+    for label, hook in hooks.items():
+        try:
+            raised = hook.flush()
+        except Exception as e:
+            failed[label] = hook
+            errors.append(f"{label} update failed: {str(e)}")
+            continue
+        if label == "Analytics":
+            alerts = raised
+    for label, hook in failed.items():
+        try:
+            hook.recover(all_inserted)
+        except Exception as e:
+            errors.append(f"{label} recovery failed: {str(e)}")
+    timer.mark("analytics")
+    
+    return {
+        "success": True,
+        "message": f"Successfully imported {inserted} transactions",
+        "bank_type": bank_type,
+        "summary": {
+            "total_in_file": len(parsed_from_csv),
+            "inserted": inserted,
+            "duplicates_skipped": skipped,
+            "alerts": alerts,
+            "errors": errors if errors else None
+        }
+    }
 
 @router.post("/bank-csv")
 async def upload_bank_csv(
+    response: Response,
     file: UploadFile = File(...),
     bank_type: str = Form("migros_bank"),  # migros_bank | raiffeisen | ubs
-    authorization: str = Header(...)
+    user: AuthenticatedUser = Depends(get_current_user)
 ):
     
     if not file.filename.endswith('.csv'):
@@ -49,8 +204,6 @@ async def upload_bank_csv(
             detail=f"Unknown bank_type '{bank_type}'. Must be one of: {', '.join(sorted(valid_bank_types))}"
         )
 
-    token = _extract_token(authorization)
-
     try:
         content = await file.read()
         try:
@@ -61,129 +214,12 @@ async def upload_bank_csv(
         raise HTTPException(status_code=400, detail="Error decoding file")
     
     try:
-        # Extract user_id (JWT sub) locally to avoid extra network call.
-        user_id = _extract_user_id_from_token(token)
-        
-        # Get user's client (with RLS)
-        supabase = get_supabase_client(token)
-        
-        # Load categories for mapping
-        categories_response = supabase.table('categories').select('*').execute()
-        categories_map = {
-            cat['name'].strip().lower(): cat['id']
-            for cat in categories_response.data
-            if cat.get('name') and cat.get('id')
-        }
-        fallback_category_id = (
-            categories_map.get("other")
-            or categories_map.get("others")
-        )
-        
-        # Use the same parser workflow that works in manual tests
-        parsed_from_csv = TransactionParser.parse_csv(content_str, bank_type=bank_type)
-        parsed_transactions = []
-        skipped = 0
-        errors = []
-        
-        # Process parsed transactions
-        for row_num, parsed in enumerate(parsed_from_csv, start=2):
-            try:
-                # Add user_id from token
-                parsed['user_id'] = user_id
-                
-                # Map category name to ID
-                category_name = parsed.pop('category_name', None)
-                category_key = category_name.strip().lower() if isinstance(category_name, str) else None
-                parsed['category_id'] = categories_map.get(category_key) if category_key else fallback_category_id
-
-                # Keep only columns that exist in the `transactions` table.
-                allowed_columns = {
-                    'user_id',
-                    'category_id',
-                    'amount',
-                    'currency',
-                    'booked_at',
-                    'description',
-                    'purpose',
-                    'iban',
-                    'import_hash',
-                    'merchant',
-                    'raw_text',
-                }
-                parsed = {k: v for k, v in parsed.items() if k in allowed_columns}
-                
-                required_fields = ('amount', 'booked_at', 'import_hash')
-                for field in required_fields:
-                    if parsed.get(field) in (None, ''):
-                        raise ValueError(f"Missing required field '{field}'")
-                
-                # Check for duplicates
-                existing_query = (
-                    supabase.table('transactions')
-                    .select('id')
-                    .eq('user_id', user_id)
-                    .eq('import_hash', parsed['import_hash'])
-                    .limit(1)
-                )
-                existing_response = existing_query.execute()
-                
-                if existing_response.data:
-                    skipped += 1
-                    continue
-                
-                parsed_transactions.append(parsed)
-                
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                continue
-        
-        # Batch insert into Supabase
-        inserted = 0
-        if parsed_transactions:
-            batch_size = 100
-            
-            for i in range(0, len(parsed_transactions), batch_size):
-                batch = parsed_transactions[i:i + batch_size]
-                batch_start_row = i + 2
-                
-                try:
-                    insert_response = (
-                        supabase.table('transactions')
-                        .insert(batch)
-                        .execute()
-                    )
-                    inserted += len(insert_response.data)
-                    
-                except Exception as e:
-                    # Continue import: retry this batch row-by-row and skip failing rows.
-                    errors.append(
-                        f"Batch starting at parsed row {batch_start_row} failed, retrying row-by-row: {str(e)}"
-                    )
-                    for offset, row in enumerate(batch):
-                        row_num = batch_start_row + offset
-                        try:
-                            single_insert = (
-                                supabase.table('transactions')
-                                .insert(row)
-                                .execute()
-                            )
-                            if single_insert.data:
-                                inserted += 1
-                        except Exception as row_error:
-                            errors.append(f"Row {row_num}: insert failed: {str(row_error)}")
-                            continue
-        
-        return {
-            "success": True,
-            "message": f"Successfully imported {inserted} transactions",
-            "bank_type": bank_type,
-            "summary": {
-                "total_in_file": len(parsed_from_csv),
-                "inserted": inserted,
-                "duplicates_skipped": skipped,
-                "errors": errors if errors else None
-            }
-        }
+        # Parsing and all database round-trips run in a worker thread so
+        # imports don't stall other requests on the event loop.
+        timer = _StageTimer()
+        result = await run_in_threadpool(_import_csv, content_str, bank_type, user, timer)
+        response.headers["Server-Timing"] = timer.header()
+        return result
         
     except HTTPException:
         raise
@@ -0,0 +1,149 @@
+import asyncio
+import math
+import os
+import time
+from typing import Optional
+
+from starlette.responses import JSONResponse
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    return float(raw) if raw else default
+
+
+_DISCONNECTED = object()
+
+
+def _replay(body: bytes, receive):
+    """An ASGI receive that yields the already-read body, then defers to `receive`."""
+    pending = True
+
+    async def replay_receive():
+        nonlocal pending
+        if pending:
+            pending = False
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+    return replay_receive
+
+
+class TokenBucket:
+    """Per-key token buckets: `burst` requests at once, refilled at `rate` per second."""
+
+    _MAX_KEYS = 10_000
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, tuple[float, float]] = {}  # key -> (tokens, updated_at)
+
+    def take(self, key: str) -> float:
+        """Consume one token. Returns 0 on success, else the seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0  # rate limiting disabled
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+        if len(self._buckets) >= self._MAX_KEYS and key not in self._buckets:
+            self._prune(now)
+        self._buckets[key] = (tokens - 1, now)
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping
+        for key, (tokens, updated_at) in list(self._buckets.items()):
+            if tokens + (now - updated_at) * self.rate >= self.burst:
+                del self._buckets[key]
+
+
+class UploadAdmissionMiddleware:
+    """
+    Admission control for the import endpoints below `path_prefix`:
+      - per-user token bucket (UPLOAD_RATE_PER_MINUTE, UPLOAD_RATE_BURST; 0 disables)
+      - max request body, enforced while the body streams in (UPLOAD_MAX_BYTES);
+        the body is read in full before an import slot is taken
+      - global cap on concurrent imports (UPLOAD_MAX_CONCURRENT)
+    Waiting for a slot lasts at most UPLOAD_QUEUE_TIMEOUT_SECONDS.
+    Rejected requests get 429 + Retry-After (413 for oversized bodies).
+    Must run inside SupabaseAuthMiddleware, which provides the user.
+    """
+
+    def __init__(self, app, path_prefix: str = "/api/upload/"):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.max_bytes = int(_env_number("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+        self.queue_timeout = _env_number("UPLOAD_QUEUE_TIMEOUT_SECONDS", 2)
+        self.rate_limiter = TokenBucket(
+            rate=_env_number("UPLOAD_RATE_PER_MINUTE", 10) / 60,
+            burst=_env_number("UPLOAD_RATE_BURST", 5),
+        )
+        self._max_concurrent = int(_env_number("UPLOAD_MAX_CONCURRENT", 4))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                await self._reject(scope, receive, send, 413, "Upload too large")
+                return
+
+        user = scope.get("state", {}).get("user")
+        user_key = user.user_id if user else "anonymous"
+        retry_after = self.rate_limiter.take(user_key)
+        if retry_after:
+            await self._reject(scope, receive, send, 429, "Too many uploads, slow down", retry_after)
+            return
+
+        # Read the body before taking an import slot, so slow uploads don't
+        # hold one while they stream in.
+        body = await self._read_body(receive)
+        if body is None:
+            await self._reject(scope, receive, send, 413, "Upload too large")
+            return
+        if body is _DISCONNECTED:
+            return
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            await self._reject(scope, receive, send, 429, "Server busy with other imports", 1)
+            return
+
+        try:
+            await self.app(scope, _replay(body, receive), send)
+        finally:
+            self._semaphore.release()
+
+    async def _read_body(self, receive):
+        """The whole request body; None once it exceeds max_bytes, _DISCONNECTED if the client left."""
+        chunks = []
+        received = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return _DISCONNECTED
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > self.max_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _reject(self, scope, receive, send, status_code: int, detail: str, retry_after: float = 0):
+        headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if status_code == 429 else None
+        response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+        await response(scope, receive, send)
@@ -0,0 +1,212 @@
+"""
+Incremental spending analytics, updated while an import inserts rows.
+
+Per user and category we keep running statistics of expense amounts (CHF)
+in `category_stats`: one row per month plus an all-time row (month "all").
+Statistics use Welford's algorithm, so each new row costs O(1) and the
+transaction history is never rescanned; an import's statistics are merged
+into the stored ones server-side. While updating, we flag:
+  - outliers: an expense more than OUTLIER_Z standard deviations above the
+    category's all-time mean (after MIN_SAMPLES expenses)
+  - budget overruns: a month's total crossing `category_budgets.monthly_limit`
+Alerts are written to the `alerts` table.
+"""
+import math
+import uuid
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+OUTLIER_Z = 3.0
+MIN_SAMPLES = 5
+ALL_TIME = "all"
+
+
+@dataclass(slots=True)
+class RunningStats:
+    count: int = 0
+    total: float = 0.0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+def _expense(row: dict) -> Optional[tuple[str, str, float]]:
+    """(category_id, month, CHF spent) of a categorised expense row, else None."""
+    category_id = row.get('category_id')
+    amount = row.get('amount_chf')
+    if amount is None:
+        amount = row.get('amount')
+    if not category_id or amount is None or amount >= 0:
+        return None
+    return category_id, row['booked_at'][:7], -amount
+
+
+class ImportAnalyzer:
+    """
+    Collects stats updates and alerts for one import. Call `load` once with
+    the booking dates of the rows to insert, `observe` for every inserted chunk, and
+    `flush` at the end (one RPC + one insert); if any of them fails, `recover`.
+
+    Only this import's samples are sent: the `merge_category_stats` function
+    (backend/sql/category_stats.sql) merges them into the stored rows
+    atomically, so concurrent imports for one user never lose each other's
+    updates. Outliers are judged against the all-time stats loaded at the
+    start plus this import's rows; budgets against the merged monthly totals.
+    """
+
+    def __init__(self, supabase, user_id: str):
+        self.supabase = supabase
+        self.user_id = user_id
+        self.import_id = str(uuid.uuid4())
+        self.overall: dict[str, RunningStats] = {}  # category_id -> all-time stats, this import included
+        self.deltas: dict[tuple[str, str], RunningStats] = {}  # (category_id, month) -> this import only
+        self.budgets: dict[str, float] = {}
+        self.alerts: list[dict] = []
+        self._budgeted: dict[tuple[str, str], list[tuple[float, dict]]] = {}  # (category_id, month) -> expenses
+
+    def load(self, booked_at: Iterable[str]) -> None:
+        if not any(booked_at):
+            return
+        response = (
+            self.supabase.table('category_stats')
+            .select('category_id, count, total, mean, m2')
+            .eq('user_id', self.user_id)
+            .eq('month', ALL_TIME)
+            .execute()
+        )
+        for row in response.data:
+            self.overall[row['category_id']] = RunningStats(
+                row['count'] or 0, row['total'] or 0.0, row['mean'] or 0.0, row['m2'] or 0.0
+            )
+        response = (
+            self.supabase.table('category_budgets')
+            .select('category_id, monthly_limit')
+            .eq('user_id', self.user_id)
+            .execute()
+        )
+        self.budgets = {
+            row['category_id']: float(row['monthly_limit'])
+            for row in response.data
+            if row.get('monthly_limit') is not None
+        }
+
+    def _delta(self, category_id: str, month: str) -> RunningStats:
+        key = (category_id, month)
+        stats = self.deltas.get(key)
+        if stats is None:
+            stats = self.deltas[key] = RunningStats()
+        return stats
+
+    def observe(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            expense = _expense(row)
+            if expense is None:
+                continue
+            category_id, month, value = expense
+
+            overall = self.overall.get(category_id)
+            if overall is None:
+                overall = self.overall[category_id] = RunningStats()
+            if overall.count >= MIN_SAMPLES and overall.std > 0:
+                z = (value - overall.mean) / overall.std
+                if z > OUTLIER_Z:
+                    self._alert('outlier', category_id, month, row, (
+                        f"{value:.2f} CHF is {z:.1f} standard deviations above "
+                        f"the usual {overall.mean:.2f} CHF"
+                    ))
+            overall.add(value)
+
+            self._delta(category_id, ALL_TIME).add(value)
+            self._delta(category_id, month).add(value)
+            if category_id in self.budgets:
+                self._budgeted.setdefault((category_id, month), []).append((value, row))
+
+    def _alert(self, kind: str, category_id: str, month: str, row: dict, message: str) -> None:
+        self.alerts.append({
+            'user_id': self.user_id,
+            'kind': kind,
+            'category_id': category_id,
+            'month': month,
+            'booked_at': row.get('booked_at'),
+            'amount': row.get('amount'),
+            'import_hash': row.get('import_hash'),
+            'message': message,
+        })
+
+    def _check_budget(self, merged: dict, sent_total: float) -> None:
+        """Alert on the expense of this import that pushed a month over its budget."""
+        category_id, month = merged['category_id'], merged['month']
+        budget = self.budgets.get(category_id)
+        if budget is None or month == ALL_TIME:
+            return
+        spent = float(merged['total'] or 0) - sent_total  # before this import
+        if spent > budget:
+            return
+        for value, row in self._budgeted.get((category_id, month), []):
+            spent += value
+            if spent > budget:
+                self._alert('budget_exceeded', category_id, month, row, (
+                    f"Spending for {month} reached {spent:.2f} CHF "
+                    f"(budget {budget:.2f} CHF)"
+                ))
+                return
+
+    def _merge(self) -> None:
+        """Send this import's stats to merge_category_stats and check budgets against the result."""
+        if not self.deltas:
+            return
+        rows = [
+            {
+                'category_id': category_id,
+                'month': month,
+                'count': stats.count,
+                'total': round(stats.total, 2),
+                'mean': stats.mean,
+                'm2': stats.m2,
+            }
+            for (category_id, month), stats in self.deltas.items()
+        ]
+        response = self.supabase.rpc('merge_category_stats', {
+            'p_user_id': self.user_id,
+            'p_import_id': self.import_id,
+            'p_rows': rows,
+        }).execute()
+        sent = {(row['category_id'], row['month']): row['total'] for row in rows}
+        for merged in response.data or []:
+            self._check_budget(merged, sent[(merged['category_id'], merged['month'])])
+        self.deltas = {}
+
+    def flush(self) -> int:
+        """Merge this import's stats and persist new alerts. Returns the number of alerts raised."""
+        self._merge()
+        raised = len(self.alerts)
+        if self.alerts:
+            self.supabase.table('alerts').insert(self.alerts).execute()
+            self.alerts = []
+        return raised
+
+    def recover(self, rows: Iterable[dict]) -> None:
+        """
+        After `load`, `observe` or `flush` failed: merge the stats of all
+        inserted rows, without alerts. The import id makes this a no-op if
+        `flush` got as far as merging.
+        """
+        self.deltas = {}
+        self.budgets = {}
+        for row in rows:
+            expense = _expense(row)
+            if expense is not None:
+                category_id, month, value = expense
+                self._delta(category_id, ALL_TIME).add(value)
+                self._delta(category_id, month).add(value)
+        self._merge()
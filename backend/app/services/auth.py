@@ -0,0 +1,252 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+import jwt
+from fastapi import HTTPException, Request
+from jwt import InvalidTokenError, PyJWK
+from starlette.responses import JSONResponse
+
+from app.services.supabase import _first_env, _get_project_url
+
+
+@dataclass(frozen=True, slots=True)
+class AuthenticatedUser:
+    user_id: str
+    access_token: str
+    claims: dict
+
+
+class AuthError(Exception):
+    def __init__(self, detail: str, status_code: int = 401):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Signing keys
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _JWKSCache:
+    """
+    Supabase signing keys, fetched from the project's JWKS endpoint.
+    Keys are refreshed after `ttl` seconds, or early when a token names an
+    unknown `kid` (key rotation) — at most once every `min_refresh` seconds,
+    failed attempts included. Concurrent requests wait for one shared fetch.
+    """
+
+    def __init__(self, ttl: float = 600, min_refresh: float = 30):
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._keys: dict[str, PyJWK] = {}
+        self._fetched_at = 0.0
+        self._attempted_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _jwks_url(self) -> Optional[str]:
+        url = os.getenv("SUPABASE_JWKS_URL")
+        if url:
+            return url
+        project_url = _get_project_url()
+        if project_url:
+            return project_url.rstrip("/") + "/auth/v1/.well-known/jwks.json"
+        return None
+
+    async def _refresh(self) -> None:
+        url = self._jwks_url()
+        if not url:
+            raise AuthError("Server cannot verify tokens: SUPABASE_URL is not configured", 500)
+        self._attempted_at = time.monotonic()
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+        payload = response.json()
+        if not isinstance(payload, dict) or not isinstance(payload.get("keys"), list):
+            raise ValueError("JWKS response has no key list")
+        keys = {}
+        for jwk in payload["keys"]:
+            if not isinstance(jwk, dict):
+                continue
+            try:
+                key = PyJWK(jwk)
+            except jwt.PyJWTError:
+                continue  # unsupported key type
+            keys[jwk.get("kid") or ""] = key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _should_refresh(self, kid: str) -> bool:
+        now = time.monotonic()
+        if self._attempted_at is not None and now - self._attempted_at <= self.min_refresh:
+            return False
+        return now - self._fetched_at > self.ttl or kid not in self._keys
+
+    async def get(self, kid: Optional[str]) -> PyJWK:
+        kid = kid or ""
+        if self._should_refresh(kid):
+            async with self._lock:
+                # Another request may have refreshed while this one waited
+                if self._should_refresh(kid):
+                    try:
+                        await self._refresh()
+                    except (httpx.HTTPError, ValueError, KeyError):
+                        pass  # keep serving the keys we have
+        if not self._keys:
+            raise AuthError("Could not load token signing keys", 503)
+        key = self._keys.get(kid)
+        if key is None:
+            raise AuthError("Unknown token signing key")
+        return key
+
+
+_jwks = _JWKSCache()
+
+
+async def warm_up_signing_keys() -> None:
+    """Fetch the JWKS ahead of the first request (best effort)."""
+    if not _jwks._jwks_url():
+        return
+    try:
+        await _jwks._refresh()
+    except (httpx.HTTPError, ValueError, KeyError):
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Token verification
+# ─────────────────────────────────────────────────────────────────────────────
+
+# token -> claims, kept until the token expires
+_claims_cache: dict[str, dict] = {}
+_CLAIMS_CACHE_MAX = 4096
+
+
+def _cached_claims(token: str) -> Optional[dict]:
+    claims = _claims_cache.get(token)
+    if claims is None:
+        return None
+    if claims["exp"] <= time.time():
+        _claims_cache.pop(token, None)
+        return None
+    return claims
+
+
+def _remember_claims(token: str, claims: dict) -> None:
+    if len(_claims_cache) >= _CLAIMS_CACHE_MAX:
+        now = time.time()
+        for cached_token in [t for t, c in _claims_cache.items() if c["exp"] <= now]:
+            del _claims_cache[cached_token]
+        while len(_claims_cache) >= _CLAIMS_CACHE_MAX:
+            del _claims_cache[next(iter(_claims_cache))]
+    _claims_cache[token] = claims
+
+
+async def verify_token(token: str) -> dict:
+    """
+    Verify a Supabase access token locally and return its claims.
+    HS256 tokens are checked against SUPABASE_JWT_SECRET, asymmetric ones
+    against the project's JWKS.
+    """
+    claims = _cached_claims(token)
+    if claims is not None:
+        return claims
+
+    try:
+        header = jwt.get_unverified_header(token)
+    except InvalidTokenError:
+        raise AuthError("Invalid token format")
+
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        key = _first_env("SUPABASE_JWT_SECRET")
+        if not key:
+            raise AuthError("Server cannot verify tokens: SUPABASE_JWT_SECRET is not configured", 500)
+    elif algorithm in ("RS256", "ES256"):
+        key = (await _jwks.get(header.get("kid"))).key
+    else:
+        raise AuthError("Unsupported token algorithm")
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated"),
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise AuthError("Token has expired")
+    except InvalidTokenError:
+        raise AuthError("Invalid token")
+
+    _remember_claims(token, claims)
+    return claims
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Middleware
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _extract_token(authorization: str) -> str:
+    if not authorization or not authorization.startswith("Bearer "):
+        raise AuthError("Invalid authorization header. Use: Bearer <token>")
+    token = authorization[len("Bearer "):].strip()
+    if not token:
+        raise AuthError("Missing bearer token")
+    return token
+
+
+class SupabaseAuthMiddleware:
+    """
+    Verifies the bearer token of every request below `protected_prefix`
+    before the body is read, so bad or expired tokens never reach parsing
+    or the database. The verified user is stored on `request.state.user`.
+    """
+
+    def __init__(self, app, protected_prefix: str = "/api/"):
+        self.app = app
+        self.protected_prefix = protected_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(self.protected_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = ""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin1")
+                break
+
+        try:
+            token = _extract_token(authorization)
+            claims = await verify_token(token)
+        except AuthError as e:
+            response = JSONResponse(
+                {"detail": e.detail},
+                status_code=e.status_code,
+                headers={"WWW-Authenticate": "Bearer"} if e.status_code == 401 else None,
+            )
+            await response(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["user"] = AuthenticatedUser(
+            user_id=claims["sub"], access_token=token, claims=claims
+        )
+        await self.app(scope, receive, send)
+
+
+def get_current_user(request: Request) -> AuthenticatedUser:
+    """Route dependency: the user verified by SupabaseAuthMiddleware."""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.services.transaction_parser import TransactionParser
+
+
+def _ttl_seconds() -> float:
+    return float(os.getenv("CATEGORY_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryLookup:
+    """A user's categories, with the mapping.json names already resolved to ids."""
+
+    ids_by_name: dict[str, str]
+    fallback_id: Optional[str]
+    mapping_ids: dict[str, Optional[str]]
+
+    def resolve(self, category_name: Optional[str]) -> Optional[str]:
+        if category_name in self.mapping_ids:
+            return self.mapping_ids[category_name]
+        category_key = category_name.strip().lower() if isinstance(category_name, str) else None
+        return self.ids_by_name.get(category_key) if category_key else self.fallback_id
+
+
+# user_id -> (expires_at, lookup)
+_cache: dict[str, tuple[float, CategoryLookup]] = {}
+_CACHE_MAX = 4096
+_lock = threading.Lock()
+
+
+def _build_lookup(rows: list[dict]) -> CategoryLookup:
+    ids_by_name = {
+        cat['name'].strip().lower(): cat['id']
+        for cat in rows
+        if cat.get('name') and cat.get('id')
+    }
+    fallback_id = ids_by_name.get("other") or ids_by_name.get("others")
+    mapping_names = [*TransactionParser.load_mapping().keys(), "Others"]
+    mapping_ids = {name: ids_by_name.get(name.strip().lower()) for name in mapping_names}
+    return CategoryLookup(ids_by_name, fallback_id, mapping_ids)
+
+
+def _remember(user_id: str, expires_at: float, lookup: CategoryLookup, now: float) -> None:
+    # Call with _lock held
+    if len(_cache) >= _CACHE_MAX and user_id not in _cache:
+        for cached_user in [u for u, (expires, _) in _cache.items() if expires <= now]:
+            del _cache[cached_user]
+        while len(_cache) >= _CACHE_MAX:
+            del _cache[next(iter(_cache))]
+    _cache[user_id] = (expires_at, lookup)
+
+
+def get_category_lookup(user_id: str, supabase) -> CategoryLookup:
+    """
+    Return the cached category lookup for a user, loading it with the
+    user's client (RLS) when missing or older than the TTL.
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(user_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    response = supabase.table('categories').select('id, name').execute()
+    lookup = _build_lookup(response.data)
+    with _lock:
+        _remember(user_id, now + _ttl_seconds(), lookup, now)
+    return lookup
+
+
+def invalidate_categories(user_id: Optional[str] = None) -> None:
+    """Drop the cached categories of one user (or of everyone). Call after category edits."""
+    with _lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
@@ -0,0 +1,116 @@
+"""
+Local FX rates for converting transaction amounts to CHF.
+
+Rates come from an ECB reference-rate dump (eurofxref-hist.csv, one row per
+business day, rates quoted per EUR). No network access at runtime: drop the
+file at FX_RATES_PATH (default backend/fx/eurofxref-hist.csv).
+"""
+import csv
+import math
+import os
+from array import array
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_FX_RATES_PATH = Path(__file__).resolve().parents[2] / "fx" / "eurofxref-hist.csv"
+
+# Currencies the ECB publishes (including discontinued ones). Any other
+# three-letter "currency" the parser picked up from free text is treated as
+# the account currency (CHF).
+ECB_CURRENCIES = frozenset({
+    "EUR", "USD", "JPY", "BGN", "CYP", "CZK", "DKK", "EEK", "GBP", "HUF",
+    "LTL", "LVL", "MTL", "PLN", "ROL", "RON", "SEK", "SIT", "SKK", "CHF",
+    "ISK", "NOK", "HRK", "RUB", "TRL", "TRY", "AUD", "BRL", "CAD", "CNY",
+    "HKD", "IDR", "ILS", "INR", "KRW", "MXN", "MYR", "NZD", "PHP", "SGD",
+    "THB", "ZAR",
+})
+
+
+class FxTable:
+    """
+    CHF-per-unit rates per currency, stored as one array per currency indexed
+    by (date ordinal - first date ordinal). Days without a quote (weekends,
+    holidays) carry the previous business day's rate, so every lookup is a
+    single array index.
+    """
+
+    __slots__ = ("first_ordinal", "_chf_per_unit")
+
+    def __init__(self, first_ordinal: int = 0, chf_per_unit: Optional[dict[str, array]] = None):
+        self.first_ordinal = first_ordinal
+        self._chf_per_unit = chf_per_unit or {}
+
+    @classmethod
+    def from_ecb_csv(cls, path) -> "FxTable":
+        quotes: dict[int, dict[str, float]] = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                day = (row.pop("Date", None) or "").strip()
+                if not day:
+                    continue
+                rates = {}
+                for currency, value in row.items():
+                    if not currency or not currency.strip():
+                        continue  # trailing comma in ECB dumps
+                    try:
+                        rates[currency.strip()] = float(value)
+                    except (TypeError, ValueError):
+                        continue  # "N/A"
+                quotes[date.fromisoformat(day).toordinal()] = rates
+        if not quotes:
+            return cls()
+
+        first, last = min(quotes), max(quotes)
+        currencies = {c for rates in quotes.values() for c in rates} | {"EUR"}
+        chf_per_unit = {c: array("d", [math.nan]) * (last - first + 1) for c in currencies}
+
+        current: dict[str, float] = {}
+        for offset in range(last - first + 1):
+            day_rates = quotes.get(first + offset)
+            if day_rates:
+                current.update(day_rates)
+            eur_chf = current.get("CHF")
+            if not eur_chf:
+                continue
+            for currency, values in chf_per_unit.items():
+                per_eur = 1.0 if currency == "EUR" else current.get(currency)
+                if per_eur:
+                    values[offset] = eur_chf / per_eur
+        return cls(first, chf_per_unit)
+
+    def rate(self, currency: str, booked_at: str) -> Optional[float]:
+        """CHF per unit of `currency` on the booking date (YYYY-MM-DD), or None if unknown."""
+        if currency == "CHF":
+            return 1.0
+        values = self._chf_per_unit.get(currency)
+        if values is None:
+            return None
+        try:
+            offset = date.fromisoformat(booked_at[:10]).toordinal() - self.first_ordinal
+        except ValueError:
+            return None
+        if offset < 0:
+            return None
+        value = values[min(offset, len(values) - 1)]  # after the dump: latest rate
+        return None if math.isnan(value) else value
+
+    def to_chf(self, amount: float, currency: Optional[str], booked_at: str) -> tuple[Optional[float], Optional[float]]:
+        """Return (amount in CHF, rate used); (None, None) if no rate is available."""
+        currency = (currency or "CHF").upper()
+        if currency not in ECB_CURRENCIES:
+            currency = "CHF"
+        rate = self.rate(currency, booked_at)
+        if rate is None:
+            return None, None
+        return round(amount * rate, 2), rate
+
+
+@lru_cache()
+def get_fx_table() -> FxTable:
+    """Load the FX table once per process; empty (CHF only) if no dump is present."""
+    path = os.getenv("FX_RATES_PATH") or DEFAULT_FX_RATES_PATH
+    if not os.path.exists(path):
+        return FxTable()
+    return FxTable.from_ecb_csv(path)
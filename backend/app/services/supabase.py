@@ -1,11 +1,31 @@
-from supabase import create_client, Client
-from functools import lru_cache
+"""
+Supabase clients.
+
+Request handlers only use PostgREST, so user clients are plain PostgREST
+clients sharing one pooled httpx.Client. The full `supabase` SDK (realtime,
+storage, functions, websockets) is imported lazily, only for the admin
+client, which keeps it off the cold-start path.
+"""
 import os
-from dotenv import load_dotenv
-from typing import Optional
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+from postgrest import SyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS, DEFAULT_POSTGREST_CLIENT_TIMEOUT
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+
 
-load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / ".env")
+def load_env() -> None:
+    """Load backend/.env for local development; deployments set the variables directly."""
+    if ENV_PATH.exists():
+        from dotenv import load_dotenv
+        load_dotenv(dotenv_path=ENV_PATH)
 
 
 def _first_env(*keys: str) -> Optional[str]:
@@ -28,39 +48,79 @@ def _get_public_client_key() -> Optional[str]:
         "VITE_SUPABASE_ANON_KEY",
     )
 
+def pool_size() -> int:
+    """
+    Connections in the shared PostgREST pool. The worker threadpool is capped
+    to the same size (see main.lifespan): each thread makes one request at a
+    time, so no blocked caller ever waits for a free connection.
+    """
+    return int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "40"))
+
+
+@lru_cache()
+def get_http_client() -> httpx.Client:
+    """
+    Connection pool shared by all PostgREST clients of this process, so
+    requests reuse warm (HTTP/2) connections instead of opening new ones.
+    """
+    size = pool_size()
+    return httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT,
+        limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+    )
+
+
+def warm_up_connection() -> None:
+    """Open a pooled connection to PostgREST ahead of the first request (best effort)."""
+    url = _get_project_url()
+    if not url:
+        return
+    try:
+        get_http_client().head(url.rstrip("/") + "/rest/v1/", timeout=5)
+    except httpx.HTTPError:
+        pass
+
+
 @lru_cache()
-def get_supabase_admin_client() -> Client:
+def get_supabase_admin_client() -> "Client":
     """
     Admin client with service_role (bypasses RLS)
     Use for system operations only
     """
+    from supabase import create_client
+
     url = _get_project_url()
     key = _first_env("SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_SECRET_KEY") or _get_public_client_key()
-    
+
     if not url or not key:
         raise ValueError("Missing Supabase admin credentials in .env")
-    
+
     return create_client(url, key)
 
 
-def get_supabase_client(access_token: Optional[str] = None) -> Client:
+def get_supabase_client(access_token: Optional[str] = None) -> SyncPostgrestClient:
     """
     Client for user operations (respects RLS)
     If access_token provided, sets user context
     """
     url = _get_project_url()
     key = _get_public_client_key()
-    
+
     if not url or not key:
         raise ValueError(
             "Missing Supabase credentials. Set SUPABASE_URL and one of: "
             "SUPABASE_ANON_KEY, SUPABASE_KEY, or VITE_SUPABASE_PUBLISHABLE_DEFAULT_KEY."
         )
-    
-    client = create_client(url, key)
-    
-    # If token provided, set auth context
-    if access_token:
-        client.postgrest.auth(access_token)
-    
-    return client
+
+    return SyncPostgrestClient(
+        url.rstrip("/") + "/rest/v1",
+        headers={
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apikey": key,
+            # With a token, requests run as that user (RLS applies)
+            "Authorization": f"Bearer {access_token or key}",
+        },
+        http_client=get_http_client(),
+    )
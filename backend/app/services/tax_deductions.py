@@ -0,0 +1,290 @@
+"""
+Swiss tax-deduction candidates, detected from a user's categorised expenses.
+
+Rules reuse the category vocabulary from mapping.json. Results are summed per
+tax year and cached in the `tax_deduction_summaries` table. Imports
+invalidate the years they touch, before inserting and again when done, and
+a year without a cached summary is scanned once on its next read.
+
+Every invalidation writes a new `version`; a scan is only cached if the
+version it started from is still current, so a scan that overlaps an import
+never caches a half-imported year.
+"""
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
+
+from postgrest.exceptions import APIError
+
+from app.services.transaction_parser.patterns import MAPPING, compile_lowercase
+from app.services.transaction_pages import iter_transaction_pages
+
+TOP_MERCHANTS = 10
+
+
+@dataclass(frozen=True, slots=True)
+class DeductionRule:
+    id: str                          # matches the ids used by TaxDeductionsPage
+    categories: Optional[frozenset]  # lowercased category names, None = any
+    terms: Optional[re.Pattern]      # matched against lowercased text, None = any
+
+
+def _mapping_terms(category: str, keep: Iterable[str] = (), extra: Iterable[str] = ()) -> str:
+    """Alternatives of a mapping.json category, optionally narrowed to `keep`."""
+    terms = MAPPING.get(category, "").split("|")
+    keep = set(keep)
+    if keep:
+        terms = [t for t in terms if t.lower() in keep]
+    return "|".join([*terms, *extra])
+
+
+def _compile(pattern: str, word_bounded: bool = False) -> re.Pattern:
+    if word_bounded:
+        pattern = rf"\b(?:{pattern})\b"
+    return compile_lowercase(pattern)
+
+
+# First matching rule wins.
+RULES = (
+    DeductionRule(
+        "pillar3a",
+        frozenset({"savings & investment"}),
+        _compile(
+            _mapping_terms(
+                "Savings & Investment",
+                keep={"viac", "finpension", "pillar 3a", "säule 3a"},
+                extra=("frankly", "3a"),
+            ),
+            word_bounded=True,
+        ),
+    ),
+    # Health, accident and life insurance premiums; property and vehicle
+    # insurers (AXA, Mobiliar, Zurich, ...) are left out.
+    DeductionRule(
+        "insurance",
+        frozenset({"insurance"}),
+        _compile(
+            _mapping_terms(
+                "Insurance",
+                keep={
+                    "helsana", "css", "swica", "assura", "visana", "sanitas", "kpt", "concordia",
+                    "atupri", "suva", "group mutuel", "egk", "progres", "sansan", "intras",
+                    "arcosana", "amavisit", "sympany", "ökk",
+                },
+                extra=(
+                    "krankenkasse", "krankenversicherung", "unfallversicherung",
+                    "lebensversicherung", "cassa malati", "caisse maladie",
+                ),
+            ),
+            word_bounded=True,
+        ),
+    ),
+    DeductionRule("health", frozenset({"health"}), None),
+    DeductionRule("education", frozenset({"education"}), None),
+    DeductionRule(
+        "transport",
+        frozenset({"transport"}),
+        _compile(_mapping_terms(
+            "Transport",
+            keep={
+                "sbb", "cff", "ffs", "zvv", "vbl", "vbg", "vbsl", "fairtiq", "easyride",
+                "libero", "ostwind", "mobilis", "unireso", "z-pass",
+            },
+            extra=("postauto", "ferrovie federali", "arcobaleno", "tpg", "bernmobil"),
+        )),
+    ),
+    DeductionRule(
+        "donations",
+        None,
+        _compile(
+            r"spende\w*|caritas|unicef|rotes kreuz|croce rossa|croix-rouge|srk|wwf|greenpeace"
+            "|helvetas|swissaid|pro juventute|pro senectute|heks|fastenaktion|glückskette"
+            "|catena della solidarietà|amnesty|msf|ärzte ohne grenzen|medici senza frontiere",
+            word_bounded=True,
+        ),
+    ),
+)
+
+
+def match_rule(category_name: Optional[str], text: str) -> Optional[str]:
+    """Return the id of the first rule matching a transaction, if any."""
+    category = (category_name or "").strip().lower()
+    for rule in RULES:
+        if rule.categories is not None and category not in rule.categories:
+            continue
+        if rule.terms is not None and not rule.terms.search(text):
+            continue
+        return rule.id
+    return None
+
+
+def _search_text(row: dict) -> str:
+    return " ".join(
+        row.get(col) or "" for col in ("description", "merchant", "counterparty", "purpose")
+    ).lower()
+
+
+def empty_summary() -> dict:
+    return {rule.id: {"total": 0.0, "count": 0, "merchants": {}} for rule in RULES}
+
+
+def accumulate(summary: dict, rows: Iterable[dict], category_names: dict) -> None:
+    """
+    Add expense rows to a per-year summary. `category_names` maps
+    category_id -> name for rows that don't carry a joined category.
+    """
+    for row in rows:
+        amount = row.get('amount_chf')
+        if amount is None:
+            amount = row.get('amount')
+        if amount is None or amount >= 0:
+            continue
+        category = row.get('categories')
+        category_name = category.get('name') if category else category_names.get(row.get('category_id'))
+        rule_id = match_rule(category_name, _search_text(row))
+        if not rule_id:
+            continue
+        entry = summary[rule_id]
+        value = -amount
+        entry["total"] = round(entry["total"] + value, 2)
+        entry["count"] += 1
+        name = row.get('counterparty') or row.get('merchant') or row.get('description') or "Unknown"
+        entry["merchants"][name] = round(entry["merchants"].get(name, 0.0) + value, 2)
+
+
+def _save(supabase, user_id: str, tax_year: int, summary: dict, updated_at: str, version: Optional[str]) -> bool:
+    """
+    Cache a scanned summary unless the year was invalidated since `version`
+    was read (None: there was no row). Returns whether it was cached.
+    """
+    row = {'summary': summary, 'updated_at': updated_at}
+    if version is None:
+        try:
+            supabase.table('tax_deduction_summaries').insert(
+                {'user_id': user_id, 'tax_year': tax_year, 'version': str(uuid.uuid4()), **row}
+            ).execute()
+        except APIError as e:
+            if e.code != '23505':
+                raise
+            return False  # an import (or another read) created the row meanwhile
+        return True
+    response = (
+        supabase.table('tax_deduction_summaries')
+        .update(row)
+        .eq('user_id', user_id)
+        .eq('tax_year', tax_year)
+        .eq('version', version)
+        .execute()
+    )
+    return bool(response.data)
+
+
+def compute_summary(supabase, user_id: str, tax_year: int, version: Optional[str] = None) -> dict:
+    """
+    Scan one tax year of transactions and return its summary, caching it
+    if no import invalidated the year meanwhile. `version` is the one read
+    before the scan started.
+    """
+    summary = empty_summary()
+    pages = iter_transaction_pages(
+        supabase,
+        user_id,
+        'id, booked_at, amount, amount_chf, description, merchant, counterparty, purpose, categories(name)',
+        date_from=date(tax_year, 1, 1),
+        date_to=date(tax_year, 12, 31),
+    )
+    for rows in pages:
+        accumulate(summary, rows, {})
+    updated_at = datetime.now(timezone.utc).isoformat()
+    _save(supabase, user_id, tax_year, summary, updated_at, version)
+    return {'tax_year': tax_year, 'summary': summary, 'updated_at': updated_at}
+
+
+def get_summary(supabase, user_id: str, tax_year: int, refresh: bool = False) -> dict:
+    """Return the cached summary for a tax year, computing it when missing or invalidated."""
+    response = (
+        supabase.table('tax_deduction_summaries')
+        .select('tax_year, summary, version, updated_at')
+        .eq('user_id', user_id)
+        .eq('tax_year', tax_year)
+        .limit(1)
+        .execute()
+    )
+    cached = response.data[0] if response.data else None
+    if cached and cached['summary'] is not None and not refresh:
+        return cached
+    return compute_summary(supabase, user_id, tax_year, cached['version'] if cached else None)
+
+
+def invalidate(supabase, user_id: str, years: Iterable[int]) -> None:
+    """Drop the cached summaries of `years` and bump their versions, in one upsert."""
+    years = sorted(set(years))
+    if not years:
+        return
+    updated_at = datetime.now(timezone.utc).isoformat()
+    supabase.table('tax_deduction_summaries').upsert(
+        [
+            {
+                'user_id': user_id,
+                'tax_year': tax_year,
+                'summary': None,
+                'version': str(uuid.uuid4()),
+                'updated_at': updated_at,
+            }
+            for tax_year in years
+        ],
+        on_conflict='user_id,tax_year',
+    ).execute()
+
+
+def format_summary(cached: dict) -> dict:
+    deductions = []
+    for rule in RULES:
+        entry = cached['summary'].get(rule.id) or {"total": 0.0, "count": 0, "merchants": {}}
+        merchants = sorted(entry["merchants"].items(), key=lambda item: item[1], reverse=True)
+        deductions.append({
+            "id": rule.id,
+            "total": entry["total"],
+            "count": entry["count"],
+            "merchants": [
+                {"name": name, "amount": amount} for name, amount in merchants[:TOP_MERCHANTS]
+            ],
+        })
+    return {
+        "tax_year": cached['tax_year'],
+        "updated_at": cached.get('updated_at'),
+        "deductions": deductions,
+    }
+
+
+class TaxSummaryInvalidator:
+    """
+    Import hook: invalidates the cached summaries of the years an import
+    touches, once before the first insert (so a crashed import leaves no
+    stale summary behind) and once at the end (which also discards any
+    summary a concurrent read cached mid-import). The years are rescanned
+    on their next read.
+    """
+
+    def __init__(self, supabase, user_id: str):
+        self.supabase = supabase
+        self.user_id = user_id
+        self.years: set[int] = set()
+
+    def load(self, booked_at: Iterable[str]) -> None:
+        self.years = {int(day[:4]) for day in booked_at}
+        invalidate(self.supabase, self.user_id, self.years)
+
+    def observe(self, rows: Iterable[dict]) -> None:
+        pass  # the years are known from load
+
+    def flush(self) -> int:
+        """Invalidate the touched years again. Returns how many years were invalidated."""
+        invalidate(self.supabase, self.user_id, self.years)
+        return len(self.years)
+
+    def recover(self, rows: Iterable[dict]) -> None:
+        """After `load` or `flush` failed: invalidate the years of the inserted rows."""
+        invalidate(self.supabase, self.user_id, {int(row['booked_at'][:4]) for row in rows})
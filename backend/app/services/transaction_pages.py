@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Iterator, Optional
+
+PAGE_SIZE = 1000
+
+
+def iter_transaction_pages(
+    supabase,
+    user_id: str,
+    select: str,
+    iban: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    category_id: Optional[str] = None,
+    page_size: int = PAGE_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Page through a user's transactions ordered by (booked_at, id), using keyset
+    pagination: each page starts after the last row seen, so memory stays at
+    one page and deep pages cost the same as the first. `select` must include
+    booked_at and id.
+
+    Paging stops at the first empty page, not at a short one: PostgREST caps
+    responses at its db-max-rows, which may be below `page_size`.
+    """
+    last = None
+    while True:
+        query = (
+            supabase.table('transactions')
+            .select(select)
+            .eq('user_id', user_id)
+        )
+        if iban:
+            query = query.eq('iban', iban)
+        if date_from:
+            query = query.gte('booked_at', date_from.isoformat())
+        if date_to:
+            query = query.lte('booked_at', date_to.isoformat())
+        if category_id:
+            query = query.eq('category_id', category_id)
+        if last:
+            last_date, last_id = last
+            query = query.or_(
+                f"booked_at.gt.{last_date},and(booked_at.eq.{last_date},id.gt.{last_id})"
+            )
+        rows = query.order('booked_at').order('id').limit(page_size).execute().data
+        if not rows:
+            return
+        yield rows
+        last = (rows[-1]['booked_at'], rows[-1]['id'])
@@ -0,0 +1,18 @@
+"""
+Bank CSV parsing (Raiffeisen, Migros Bank, UBS).
+
+Names are imported lazily, so importing the package stays cheap until the
+parser is actually used; the first use compiles all patterns once.
+"""
+
+__all__ = ["ParsedTransaction", "TransactionBatch", "TransactionParser"]
+
+
+def __getattr__(name):
+    if name in ("ParsedTransaction", "TransactionBatch"):
+        from . import records
+        return getattr(records, name)
+    if name == "TransactionParser":
+        from .parser import TransactionParser
+        return TransactionParser
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,118 @@
+"""
+Enrichment stage: derives payment method, counterparty, direction, a
+default purpose and the CHF amount for each parsed transaction.
+
+Enrichers are plain callables that update a ParsedTransaction in place;
+TransactionParser.enrichers lists the ones that run after parsing.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional
+
+from app.services.fx import get_fx_table
+
+from . import patterns
+from .records import ParsedTransaction
+
+Enricher = Callable[[ParsedTransaction], None]
+
+
+class Rule(NamedTuple):
+    pattern: str             # matched against the uppercased description
+    prefix: bool             # True: must start the description; False: anywhere
+    payment_method: str
+    purpose: Optional[str]
+    direction: Optional[str]  # hint when the amount is 0
+
+
+# First matching rule wins.
+RULES = (
+    Rule("ACCREDITO TWINT", False, "twint", "Incoming TWINT transfer", "in"),
+    Rule("PAGAMENTO TWINT", False, "twint", "Outgoing TWINT transfer", "out"),
+    Rule("ACQUISTO TWINT", False, "twint", "TWINT purchase", "out"),
+    Rule("RIPORTO DA", True, "internal_transfer", "Internal transfer in", "in"),
+    Rule("RIPORTO SU", True, "internal_transfer", "Internal transfer out", "out"),
+    Rule("ORDINE PERMANENTE", True, "standing_order", "Standing order", "out"),
+    Rule("LSV", True, "direct_debit", "Direct debit", "out"),
+    Rule("PAGAMENTO", True, "transfer", "Payment", "out"),
+    Rule("ACCREDITO", True, "credit", "Credit", "in"),
+    Rule("PRELEVAMENTO", True, "cash_withdrawal", None, "out"),
+    Rule("DEPOSITO", True, "cash_deposit", None, "in"),
+    Rule("ACQUISTO", True, "card", None, "out"),
+    Rule("DAUERAUFTRAG", True, "standing_order", None, "out"),
+    Rule("LASTSCHRIFT", True, "direct_debit", None, "out"),
+    Rule("BARGELDBEZUG", True, "cash_withdrawal", None, "out"),
+    Rule("KARTENZAHLUNG", True, "card", None, "out"),
+    Rule("TWINT", False, "twint", None, None),
+    Rule(r"VISA|MASTERCARD|MAESTRO|DEBIT CARD", False, "card", None, None),
+)
+
+# All rules compiled into one anchored alternation with a named group per
+# rule; alternatives are tried in order, so the first matching rule wins.
+_RULE_REGEX = re.compile(
+    "^(?:"
+    + "|".join(
+        f"(?P<r{i}>{'' if rule.prefix else '.*?'}(?:{rule.pattern}))"
+        for i, rule in enumerate(RULES)
+    )
+    + ")"
+)
+
+
+class PaymentDetails(NamedTuple):
+    payment_method: Optional[str]
+    purpose: Optional[str]
+    counterparty: Optional[str]
+    direction: Optional[str]
+
+
+# Trailing foreign-currency amount, e.g. "Amazon EUR 20.00"
+_AMOUNT_SUFFIX = re.compile(r"\s+[A-Z]{3}\s*[0-9'.,]+.*$")
+
+
+def _clean_counterparty(text: str) -> Optional[str]:
+    for pattern in patterns.MERCHANT_CLEANUP:
+        text = pattern.sub("", text)
+    text = _AMOUNT_SUFFIX.sub("", text)
+    if " | " in text:
+        text = text.split(" | ")[0]
+    text = " ".join(text.strip(" ,;-").split())
+    return text or None
+
+
+@lru_cache(maxsize=8192)
+def classify(description: str) -> PaymentDetails:
+    """Evaluate the rule table once per distinct description."""
+    match = _RULE_REGEX.match(description.upper())
+    if not match:
+        return PaymentDetails(None, None, None, None)
+    rule = RULES[int(match.lastgroup[1:])]
+    remainder = description[match.end():] if rule.prefix else ""
+    return PaymentDetails(
+        rule.payment_method,
+        rule.purpose,
+        _clean_counterparty(remainder) if remainder else None,
+        rule.direction,
+    )
+
+
+def enrich_payment_details(tx: ParsedTransaction) -> None:
+    details = classify(tx.description or "")
+    tx.payment_method = details.payment_method
+    tx.counterparty = details.counterparty or tx.merchant
+    if not tx.purpose:
+        tx.purpose = details.purpose
+    if tx.amount > 0:
+        tx.direction = "in"
+    elif tx.amount < 0:
+        tx.direction = "out"
+    else:
+        tx.direction = details.direction
+
+
+def normalize_currency(tx: ParsedTransaction) -> None:
+    """Convert the amount to CHF at the booking-date rate (see app/services/fx.py)."""
+    tx.amount_chf, tx.fx_rate = get_fx_table().to_chf(tx.amount, tx.currency, tx.booked_at)
+
+
+DEFAULT_ENRICHERS: tuple[Enricher, ...] = (enrich_payment_details, normalize_currency)
@@ -1,15 +1,20 @@
 import csv
 import hashlib
-import json
-import os
-import re
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from io import StringIO
 
+from . import patterns
+from .enrichment import DEFAULT_ENRICHERS
+from .records import ParsedTransaction
+
 
 class TransactionParser:
-    # Mapping cache (loaded once per process)
-    _mapping = None
+    # Category rules, compiled from mapping.json at import time
+    _mapping = patterns.MAPPING
+    _category_patterns = patterns.CATEGORY_PATTERNS
+
+    # Run on every parsed row before categorisation (see enrichment.py)
+    enrichers = DEFAULT_ENRICHERS
 
     # ─────────────────────────────────────────────────────────────────────────
     # Public entry point
@@ -39,32 +44,30 @@ class TransactionParser:
         f = StringIO(csv_content_str.strip())
         reader = csv.DictReader(f, delimiter=";")
 
-        raw_transactions = []
-        current_tx = None
+        transactions = []
+        current = None  # (iban, booked_at, description, amount, purpose_parts)
 
         for row in reader:
             iban = (row.get("IBAN") or "").strip()
             text = cls._normalize_whitespace((row.get("Text") or "").strip())
 
             if iban:
-                if current_tx:
-                    raw_transactions.append(current_tx)
-                current_tx = {
-                    "iban": iban,
-                    "booked_at": (row.get("Booked At") or "").strip(),
-                    "description": text,
-                    "purpose_parts": [],
-                    "raw_text_parts": [text] if text else [],
-                    "amount": cls._parse_amount(row.get("Credit/Debit Amount")),
-                }
-            elif current_tx and text:
-                current_tx["purpose_parts"].append(text)
-                current_tx["raw_text_parts"].append(text)
-
-        if current_tx:
-            raw_transactions.append(current_tx)
-
-        return [cls._clean_transaction(tx) for tx in raw_transactions]
+                if current:
+                    transactions.append(cls._build_transaction(*current))
+                current = (
+                    iban,
+                    (row.get("Booked At") or "").strip(),
+                    text,
+                    cls._parse_amount(row.get("Credit/Debit Amount")),
+                    [],
+                )
+            elif current and text:
+                current[4].append(text)
+
+        if current:
+            transactions.append(cls._build_transaction(*current))
+
+        return transactions
 
     # ─────────────────────────────────────────────────────────────────────────
     # Migros Bank parser
@@ -89,9 +92,9 @@ class TransactionParser:
         # ── Extract IBAN from metadata header if present ──────────────────
         iban = ""
         for line in lines[:10]:
-            m = re.search(r"(CH\d{2}[\d\s]{16,})", line)
+            m = patterns.IBAN.search(line)
             if m:
-                iban = re.sub(r"\s+", "", m.group(1))
+                iban = patterns.WHITESPACE.sub("", m.group(1))
                 break
 
         # ── Find the data header row ──────────────────────────────────────
@@ -141,22 +144,11 @@ class TransactionParser:
             if not currency:
                 currency = cls._extract_currency(description) or "CHF"
 
-            raw_text = description
-            hash_input = f"{iban}|{date_iso}|{amount:.2f}|{currency}|{raw_text}"
-            import_hash = hashlib.md5(hash_input.encode()).hexdigest()
+            transactions.append(
+                cls._build_transaction(iban, date_iso, description, amount, currency=currency)
+            )
 
-            transactions.append({
-                "iban": iban,
-                "booked_at": date_iso,
-                "description": description,
-                "purpose_parts": [],
-                "raw_text_parts": [raw_text],
-                "amount": amount,
-                "_currency_override": currency,
-                "_import_hash_override": import_hash,
-            })
-
-        return [cls._clean_transaction(tx) for tx in transactions]
+        return transactions
 
     # ─────────────────────────────────────────────────────────────────────────
     # UBS parser
@@ -184,9 +176,9 @@ class TransactionParser:
         # ── Extract IBAN from metadata header if present ──────────────────
         iban = ""
         for line in lines[:15]:
-            m = re.search(r"(CH\d{2}[\d\s]{16,})", line)
+            m = patterns.IBAN.search(line)
             if m:
-                iban = re.sub(r"\s+", "", m.group(1))
+                iban = patterns.WHITESPACE.sub("", m.group(1))
                 break
 
         # ── Find the data header row ──────────────────────────────────────
@@ -264,26 +256,15 @@ class TransactionParser:
 
             # Try to extract CHF from amount column header (e.g. "Betrag CHF")
             if amount_key:
-                m = re.search(r"\b([A-Z]{3})\b", amount_key)
+                m = patterns.HEADER_CURRENCY.search(amount_key)
                 if m:
                     currency = m.group(1)
 
-            raw_text = description
-            hash_input = f"{iban}|{date_iso}|{amount:.2f}|{currency}|{raw_text}"
-            import_hash = hashlib.md5(hash_input.encode()).hexdigest()
-
-            transactions.append({
-                "iban": iban,
-                "booked_at": date_iso,
-                "description": description,
-                "purpose_parts": [],
-                "raw_text_parts": [raw_text],
-                "amount": amount,
-                "_currency_override": currency,
-                "_import_hash_override": import_hash,
-            })
+            transactions.append(
+                cls._build_transaction(iban, date_iso, description, amount, currency=currency)
+            )
 
-        return [cls._clean_transaction(tx) for tx in transactions]
+        return transactions
 
     # ─────────────────────────────────────────────────────────────────────────
     # Shared helpers
@@ -291,62 +272,64 @@ class TransactionParser:
 
     @classmethod
     def load_mapping(cls, filepath=None):
-        """Load mapping.json once and reuse it across rows."""
-        if cls._mapping is None:
-            if filepath is None:
-                filepath = os.path.join(os.path.dirname(__file__), "mapping.json")
-            if not os.path.exists(filepath):
-                raise FileNotFoundError(f"Die Mapping-Datei '{filepath}' wurde nicht gefunden.")
-            with open(filepath, "r", encoding="utf-8") as f:
-                cls._mapping = json.load(f)
+        """Return the category mapping; a custom file replaces the bundled one."""
+        if filepath is not None:
+            cls._mapping = patterns.load_mapping(filepath)
+            cls._category_patterns = patterns.compile_category_patterns(cls._mapping)
         return cls._mapping
 
     @classmethod
-    def _clean_transaction(cls, tx):
-        raw_text = cls._normalize_whitespace(" | ".join(tx["raw_text_parts"]))
-        description = tx.get("description") or raw_text
-        purpose = cls._normalize_whitespace(" | ".join(tx.get("purpose_parts", []))) or None
-        if not purpose:
-            purpose = cls._infer_purpose(description)
-
-        amount = tx["amount"]
-        date_clean = (tx.get("booked_at") or "").split(" ")[0]
-
-        # Allow parsers to override currency / import_hash
-        currency = tx.get("_currency_override") or cls._extract_currency(raw_text)
-        import_hash = tx.get("_import_hash_override")
-
-        merchant_name = cls._extract_merchant(description)
-
-        mapping = cls.load_mapping()
-        category_name = "Others"
-        search_text = " ".join(part for part in [description, purpose, raw_text] if part)
-        for cat, pattern in mapping.items():
-            match = re.search(f"({pattern})", search_text, re.IGNORECASE)
+    def _build_transaction(
+        cls,
+        iban: str,
+        booked_at: str,
+        description: str,
+        amount: float,
+        purpose_parts: list[str] | None = None,
+        currency: str | None = None,
+    ) -> ParsedTransaction:
+        """Turn the raw fields of one row into an enriched, categorised ParsedTransaction."""
+        raw_text_parts = ([description] if description else []) + (purpose_parts or [])
+        raw_text = cls._normalize_whitespace(" | ".join(raw_text_parts))
+        description = description or raw_text
+        purpose = cls._normalize_whitespace(" | ".join(purpose_parts or [])) or None
+
+        date_clean = (booked_at or "").split(" ")[0]
+        currency = currency or cls._extract_currency(raw_text)
+
+        hash_input = f"{iban}|{date_clean}|{amount:.2f}|{currency}|{raw_text}"
+        import_hash = hashlib.md5(hash_input.encode()).hexdigest()
+
+        tx = ParsedTransaction(
+            iban=iban,
+            booked_at=date_clean,
+            amount=amount,
+            currency=currency,
+            description=description,
+            purpose=purpose,
+            merchant=cls._extract_merchant(description),
+            category_name="Others",
+            raw_text=raw_text,
+            import_hash=import_hash,
+        )
+        for enrich in cls.enrichers:
+            enrich(tx)
+        cls._categorize(tx)
+        return tx
+
+    @classmethod
+    def _categorize(cls, tx: ParsedTransaction) -> None:
+        search_text = " ".join(
+            part for part in [tx.description, tx.purpose, tx.raw_text] if part
+        ).lower()
+        for cat, pattern in cls._category_patterns:
+            match = pattern.search(search_text)
             if match:
-                category_name = cat
-                if not merchant_name:
-                    merchant_name = match.group(1).strip().title()
+                tx.category_name = cat
+                if not tx.merchant:
+                    tx.merchant = match.group(1).strip().title()
                 break
 
-        if not import_hash:
-            iban = tx.get("iban", "")
-            hash_input = f"{iban}|{date_clean}|{amount:.2f}|{currency}|{raw_text}"
-            import_hash = hashlib.md5(hash_input.encode()).hexdigest()
-
-        return {
-            "iban": tx.get("iban", ""),
-            "booked_at": date_clean,
-            "amount": amount,
-            "currency": currency,
-            "description": description,
-            "purpose": purpose,
-            "merchant": merchant_name,
-            "category_name": category_name,
-            "raw_text": raw_text,
-            "import_hash": import_hash,
-        }
-
     @staticmethod
     def _parse_amount(amount_str) -> float:
         if amount_str is None:
@@ -376,14 +359,14 @@ class TransactionParser:
         if not s:
             return None
         # Already ISO
-        if re.match(r"^\d{4}-\d{2}-\d{2}", s):
+        if patterns.DATE_ISO.match(s):
             return s[:10]
         # DD.MM.YYYY
-        m = re.match(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})", s)
+        m = patterns.DATE_DOTTED.match(s)
         if m:
             return f"{m.group(3)}-{m.group(2).zfill(2)}-{m.group(1).zfill(2)}"
         # DD/MM/YYYY
-        m = re.match(r"^(\d{1,2})/(\d{1,2})/(\d{4})", s)
+        m = patterns.DATE_SLASHED.match(s)
         if m:
             return f"{m.group(3)}-{m.group(2).zfill(2)}-{m.group(1).zfill(2)}"
         return None
@@ -394,45 +377,17 @@ class TransactionParser:
 
     @staticmethod
     def _extract_currency(text: str) -> str:
-        match = re.search(r"\b([A-Z]{3})\s*[0-9'.,]+", text.upper())
+        match = patterns.TEXT_CURRENCY.search(text.upper())
         return match.group(1) if match else "CHF"
 
     @classmethod
     def _extract_merchant(cls, description: str):
         cleaned = description
-        cleaned = re.sub(r"^(Acquisto|Accredito|Pagamento)\s+", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"^TWINT\s+", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"\bTWINT\b", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"\s*,\s*N\.\s*carta.*$", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"\s+\d{2}\.\d{2}\.\d{4}.*$", "", cleaned)
-        cleaned = re.sub(r"\s*CHF\s*[0-9'.,]+.*$", "", cleaned, flags=re.IGNORECASE)
-        cleaned = re.sub(r"\s*-\s*MOB APP$", "", cleaned, flags=re.IGNORECASE)
+        for pattern in patterns.MERCHANT_CLEANUP:
+            cleaned = pattern.sub("", cleaned)
         # Remove pipe separators from multi-part UBS descriptions — take first segment
         if " | " in cleaned:
             cleaned = cleaned.split(" | ")[0]
         cleaned = cleaned.strip(" ,;-")
         cleaned = cls._normalize_whitespace(cleaned)
         return cleaned or None
-
-    @staticmethod
-    def _infer_purpose(description: str):
-        description_upper = (description or "").upper()
-        if "ACCREDITO TWINT" in description_upper:
-            return "Incoming TWINT transfer"
-        if "PAGAMENTO TWINT" in description_upper:
-            return "Outgoing TWINT transfer"
-        if "ACQUISTO TWINT" in description_upper:
-            return "TWINT purchase"
-        if description_upper.startswith("RIPORTO DA"):
-            return "Internal transfer in"
-        if description_upper.startswith("RIPORTO SU"):
-            return "Internal transfer out"
-        if description_upper.startswith("ORDINE PERMANENTE"):
-            return "Standing order"
-        if description_upper.startswith("LSV"):
-            return "Direct debit"
-        if description_upper.startswith("PAGAMENTO"):
-            return "Payment"
-        if description_upper.startswith("ACCREDITO"):
-            return "Credit"
-        return None
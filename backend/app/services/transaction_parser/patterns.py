@@ -0,0 +1,72 @@
+"""
+Every regex the parser uses, compiled once when this module is imported.
+Category rules come from backend/mapping.json.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+MAPPING_PATH = Path(__file__).resolve().parents[3] / "mapping.json"
+
+# ── Header / field detection ─────────────────────────────────────────────────
+IBAN = re.compile(r"(CH\d{2}[\d\s]{16,})")
+WHITESPACE = re.compile(r"\s+")
+HEADER_CURRENCY = re.compile(r"\b([A-Z]{3})\b")
+TEXT_CURRENCY = re.compile(r"\b([A-Z]{3})\s*[0-9'.,]+")
+
+DATE_ISO = re.compile(r"^\d{4}-\d{2}-\d{2}")
+DATE_DOTTED = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})")
+DATE_SLASHED = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})")
+
+# ── Merchant clean-up (applied in order) ─────────────────────────────────────
+MERCHANT_CLEANUP = (
+    re.compile(r"^(Acquisto|Accredito|Pagamento)\s+", re.IGNORECASE),
+    re.compile(r"^TWINT\s+", re.IGNORECASE),
+    re.compile(r"\bTWINT\b", re.IGNORECASE),
+    re.compile(r"\s*,\s*N\.\s*carta.*$", re.IGNORECASE),
+    re.compile(r"\s+\d{2}\.\d{2}\.\d{4}.*$"),
+    re.compile(r"\s*CHF\s*[0-9'.,]+.*$", re.IGNORECASE),
+    re.compile(r"\s*-\s*MOB APP$", re.IGNORECASE),
+)
+
+
+# ── Categories ───────────────────────────────────────────────────────────────
+
+def load_mapping(filepath=None) -> dict:
+    if filepath is None:
+        filepath = MAPPING_PATH
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"Die Mapping-Datei '{filepath}' wurde nicht gefunden.")
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_ESCAPE_OR_TEXT = re.compile(r"\\.|[^\\]+")
+
+
+def _lower_pattern(pattern: str) -> str:
+    # Lowercase literals but keep escapes such as \D or \S intact
+    return _ESCAPE_OR_TEXT.sub(
+        lambda m: m.group() if m.group().startswith("\\") else m.group().lower(), pattern
+    )
+
+
+def compile_lowercase(pattern: str) -> re.Pattern:
+    """
+    Compile a keyword alternation for matching against lowercased text,
+    which is several times faster than re.IGNORECASE on large alternations.
+    """
+    return re.compile(f"({_lower_pattern(pattern)})")
+
+
+def compile_category_patterns(mapping: dict) -> tuple:
+    """Compile mapping.json into (category, pattern) pairs, tried in file order."""
+    return tuple(
+        (category, compile_lowercase(pattern))
+        for category, pattern in mapping.items()
+    )
+
+
+MAPPING = load_mapping()
+CATEGORY_PATTERNS = compile_category_patterns(MAPPING)
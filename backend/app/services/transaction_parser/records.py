@@ -0,0 +1,84 @@
+from dataclasses import asdict, dataclass
+from typing import ClassVar, Iterable
+
+
+@dataclass(slots=True)
+class ParsedTransaction:
+    """One parsed bank row. Slotted, so large imports don't pay for a dict per row."""
+
+    iban: str
+    booked_at: str
+    amount: float
+    currency: str
+    description: str
+    purpose: str | None
+    merchant: str | None
+    category_name: str
+    raw_text: str
+    import_hash: str
+    payment_method: str | None = None
+    counterparty: str | None = None
+    direction: str | None = None  # "in" | "out"
+    amount_chf: float | None = None
+    fx_rate: float | None = None  # CHF per unit of `currency`
+    category_id: str | None = None
+
+    # Columns that exist in the `transactions` table (user_id is added per batch).
+    INSERT_COLUMNS: ClassVar[tuple[str, ...]] = (
+        "category_id",
+        "amount",
+        "currency",
+        "booked_at",
+        "description",
+        "purpose",
+        "iban",
+        "import_hash",
+        "merchant",
+        "raw_text",
+        "payment_method",
+        "counterparty",
+        "direction",
+        "amount_chf",
+        "fx_rate",
+    )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class TransactionBatch:
+    """
+    Column-oriented container for rows that are ready to be inserted.
+    Each column is a plain list, so bulk operations (duplicate lookups,
+    slicing into insert chunks) work on one list instead of N dicts.
+    """
+
+    __slots__ = ("user_id", "row_nums", "_columns")
+
+    def __init__(self, user_id: str, transactions: Iterable[ParsedTransaction] = ()):
+        self.user_id = user_id
+        self.row_nums: list[int] = []
+        self._columns = {col: [] for col in ParsedTransaction.INSERT_COLUMNS}
+        for row_num, tx in enumerate(transactions, start=2):
+            self.append(tx, row_num)
+
+    def __len__(self) -> int:
+        return len(self.row_nums)
+
+    def append(self, tx: ParsedTransaction, row_num: int) -> None:
+        self.row_nums.append(row_num)
+        for col, values in self._columns.items():
+            values.append(getattr(tx, col))
+
+    def column(self, name: str) -> list:
+        return self._columns[name]
+
+    def insert_payload(self, indices: Iterable[int] | None = None) -> list[dict]:
+        """Build the PostgREST insert body for the given row indices (all rows by default)."""
+        if indices is None:
+            indices = range(len(self))
+        columns = self._columns.items()
+        return [
+            {"user_id": self.user_id, **{col: values[i] for col, values in columns}}
+            for i in indices
+        ]
@@ -0,0 +1,64 @@
+"""
+Cold-start benchmark: runs each measurement in a fresh interpreter, so module
+imports and per-process caches start cold every time.
+
+    python bench_startup.py [runs]
+
+Reports the median and best of:
+  import        `import main` (FastAPI app, routes, parser patterns)
+  warm_up       lifespan warm-up (FX table, PostgREST connection if configured)
+  first_parse   parsing test_data.csv right after warm-up
+  supabase_sdk  what importing the full supabase SDK would add on top
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+main.warm_up()
+t2 = time.perf_counter()
+from app.services.transaction_parser import TransactionParser
+with open("test_data.csv", encoding="latin1") as f:
+    TransactionParser.parse_csv(f.read(), bank_type="raiffeisen")
+t3 = time.perf_counter()
+import supabase
+t4 = time.perf_counter()
+print(json.dumps({
+    "import": (t1 - t0) * 1000,
+    "warm_up": (t2 - t1) * 1000,
+    "first_parse": (t3 - t2) * 1000,
+    "supabase_sdk": (t4 - t3) * 1000,
+}))
+"""
+
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int) -> None:
+    samples = [run_once() for _ in range(runs)]
+    print(f"{runs} cold starts ({sys.executable})")
+    print(f"{'phase':<14}{'median ms':>12}{'best ms':>10}")
+    for phase in samples[0]:
+        values = [s[phase] for s in samples]
+        print(f"{phase:<14}{statistics.median(values):>12.1f}{min(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
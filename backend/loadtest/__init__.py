@@ -0,0 +1 @@
+"""Offline load testing for the upload path; see loadtest/__main__.py."""
@@ -0,0 +1,210 @@
+"""
+Upload load test against a local PostgREST stand-in.
+
+    python -m loadtest --users 8 --uploads 3 --rows 300 --latency-ms 20
+
+By default the fake PostgREST (loadtest/fake_postgrest.py) and the API both
+run in this process on local ports, with SUPABASE_URL pointed at the fake.
+The client shares the process (and the GIL) with the servers, so compare
+runs made with the same settings rather than reading them as absolute numbers.
+To measure a separately started API instead, pass --api-url and --fake-url
+(start the API with SUPABASE_URL=<fake-url> and the same SUPABASE_JWT_SECRET).
+
+Each virtual user uploads its statements one after another; users run
+concurrently. Reported: latency percentiles per upload, throughput, PostgREST
+round-trips per imported row and the median of each Server-Timing stage.
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+import jwt
+import uvicorn
+
+from .fake_postgrest import create_app
+from .synthetic import StatementGenerator, load_templates
+
+
+@dataclass(slots=True)
+class UploadResult:
+    status: int
+    seconds: float
+    inserted: int = 0
+    stages: dict[str, float] = field(default_factory=dict)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def _parse_server_timing(header: Optional[str]) -> dict[str, float]:
+    stages = {}
+    for part in (header or "").split(","):
+        name, _, duration = part.strip().partition(";dur=")
+        if name and duration:
+            stages[name] = float(duration)
+    return stages
+
+
+def _token(secret: str, user_id: str) -> str:
+    claims = {"sub": user_id, "aud": "authenticated", "role": "authenticated", "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    api_url: str,
+    token: str,
+    generator: StatementGenerator,
+    args: argparse.Namespace,
+    results: list[UploadResult],
+) -> None:
+    for _ in range(args.uploads):
+        body = generator.statement(args.rows, args.duplicates)
+        started = time.perf_counter()
+        response = await client.post(
+            f"{api_url}/api/upload/bank-csv",
+            headers={"Authorization": f"Bearer {token}"},
+            files={"file": ("statement.csv", body, "text/csv")},
+            data={"bank_type": "raiffeisen"},
+        )
+        result = UploadResult(response.status_code, time.perf_counter() - started)
+        if response.status_code == 200:
+            result.inserted = response.json()["summary"]["inserted"]
+            result.stages = _parse_server_timing(response.headers.get("server-timing"))
+        results.append(result)
+
+
+async def _run(args: argparse.Namespace, api_url: str, fake_url: str, secret: str) -> None:
+    templates = load_templates()
+    results: list[UploadResult] = []
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        before = (await client.get(f"{fake_url}/_stats")).json()
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _virtual_user(
+                client, api_url, _token(secret, str(uuid.uuid4())),
+                StatementGenerator(templates, seed=args.seed + i), args, results,
+            )
+            for i in range(args.users)
+        ))
+        elapsed = time.perf_counter() - started
+        after = (await client.get(f"{fake_url}/_stats")).json()
+
+    _report(args, results, elapsed, before, after)
+
+
+def _report(args, results: list[UploadResult], elapsed: float, before: dict, after: dict) -> None:
+    statuses = Counter(r.status for r in results)
+    ok = [r for r in results if r.status == 200]
+    inserted = sum(r.inserted for r in ok)
+    round_trips = after["requests"] - before["requests"]
+    routes = {
+        route: count - before["by_route"].get(route, 0)
+        for route, count in after["by_route"].items()
+        if count - before["by_route"].get(route, 0)
+    }
+
+    latency = "set on the fake" if args.api_url else f"{args.latency_ms:g} ms (+{args.jitter_ms:g} jitter)"
+    print(
+        f"{args.users} users x {args.uploads} uploads x {args.rows} rows, "
+        f"PostgREST latency {latency}, {args.duplicates:.0%} duplicates"
+    )
+    print(f"status codes      {dict(statuses)}")
+    if ok:
+        latencies = [r.seconds * 1000 for r in ok]
+        print(
+            f"latency ms        p50 {_percentile(latencies, 50):.0f}  "
+            f"p95 {_percentile(latencies, 95):.0f}  p99 {_percentile(latencies, 99):.0f}  "
+            f"max {max(latencies):.0f}"
+        )
+    print(f"throughput        {len(ok) / elapsed:.2f} uploads/s, {inserted / elapsed:.0f} rows/s ({elapsed:.1f} s)")
+    per_row = f"{round_trips / inserted:.3f}" if inserted else "n/a"
+    print(f"round-trips       {round_trips} total, {per_row} per imported row ({inserted} rows)")
+    for route, count in sorted(routes.items(), key=lambda item: -item[1]):
+        print(f"    {route:<38}{count:>6}")
+
+    stages = defaultdict(list)
+    for r in ok:
+        for name, ms in r.stages.items():
+            stages[name].append(ms)
+    if stages:
+        print("server-timing median ms  " + "  ".join(
+            f"{name} {statistics.median(values):.1f}" for name, values in stages.items()
+        ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent upload load test against a fake PostgREST.")
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users")
+    parser.add_argument("--uploads", type=int, default=3, help="uploads per user")
+    parser.add_argument("--rows", type=int, default=200, help="bookings per uploaded file")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="share of rows repeated from earlier uploads")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="added to every PostgREST request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--api-url", help="use a running API instead of starting one in-process")
+    parser.add_argument("--fake-url", help="use a running fake PostgREST (required with --api-url)")
+    args = parser.parse_args()
+
+    if args.api_url:
+        if not args.fake_url:
+            parser.error("--api-url needs --fake-url to count round-trips")
+        secret = os.getenv("SUPABASE_JWT_SECRET")
+        if not secret:
+            parser.error("set SUPABASE_JWT_SECRET to the secret the API was started with")
+        asyncio.run(_run(args, args.api_url.rstrip("/"), args.fake_url.rstrip("/"), secret))
+        return
+
+    fake_port = _free_port()
+    _serve_in_thread(create_app(args.latency_ms, args.jitter_ms), fake_port)
+    fake_url = f"http://127.0.0.1:{fake_port}"
+
+    # Point the API at the fake before main imports (and loads .env, which
+    # never overrides variables that are already set).
+    secret = secrets.token_urlsafe(32)
+    os.environ.update(
+        SUPABASE_URL=fake_url,
+        SUPABASE_ANON_KEY="loadtest-anon-key",
+        SUPABASE_JWT_SECRET=secret,
+        SUPABASE_JWKS_URL=f"{fake_url}/auth/v1/.well-known/jwks.json",
+    )
+    os.environ.setdefault("UPLOAD_RATE_PER_MINUTE", "0")
+    import main as api
+
+    api_port = _free_port()
+    _serve_in_thread(api.app, api_port)
+    asyncio.run(_run(args, f"http://127.0.0.1:{api_port}", fake_url, secret))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+In-memory stand-in for the Supabase REST API (PostgREST), for load tests.
+
+Implements the subset of PostgREST the backend uses: select with column
+lists and embedded `categories(name)`, eq/neq/gt/gte/lt/lte/in/is filters,
+`or=(...)` with nested `and(...)`, order, limit, insert, upsert
+(`on_conflict` + merge-duplicates) and update, unique constraints (409 on conflict),
+and the backend's SQL functions (`rpc_*` methods of FakeDatabase).
+Every request waits `latency_ms` (+ up to `jitter_ms`) to stand in for the
+network and database. Tokens are not verified; RLS is not emulated.
+
+    python -m loadtest.fake_postgrest --port 54321 --latency-ms 20
+
+GET /_stats returns request counts per method and table.
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+MAPPING_PATH = Path(__file__).resolve().parents[1] / "mapping.json"
+
+# embedded resource -> foreign key column on the parent row
+FOREIGN_KEYS = {"categories": "category_id"}
+
+# table -> columns that must be unique together
+UNIQUE_KEYS = {
+    "transactions": ("user_id", "import_hash"),
+    "category_stats": ("user_id", "category_id", "month"),
+    "tax_deduction_summaries": ("user_id", "tax_year"),
+    "category_stats_merges": ("user_id", "import_id"),
+}
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns", "or"}
+
+
+class PostgrestError(Exception):
+    def __init__(self, status_code: int, code: str, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Query parsing
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _split_top_level(text: str) -> list[str]:
+    """Split on commas that are not inside parentheses or double quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _unwrap(value: str) -> str:
+    """Drop one pair of enclosing parentheses (`strip` would eat nested ones too)."""
+    if value.startswith("(") and value.endswith(")"):
+        return value[1:-1]
+    return value
+
+
+def _coerce(raw: str, like):
+    if isinstance(like, bool):
+        return raw.lower() == "true"
+    if isinstance(like, (int, float)):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _condition(column: str, expression: str):
+    """Build a predicate for `column=op.value`."""
+    op, _, raw = expression.partition(".")
+    if op == "in":
+        values = [_unquote(v) for v in _split_top_level(_unwrap(raw))]
+
+        def test(row):
+            value = row.get(column)
+            return value is not None and any(value == _coerce(v, value) for v in values)
+        return test
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}[raw.lower()]
+        return lambda row: row.get(column) is expected
+    raw = _unquote(raw)
+    compare = {
+        "eq": lambda a, b: a == b,
+        "neq": lambda a, b: a != b,
+        "gt": lambda a, b: a > b,
+        "gte": lambda a, b: a >= b,
+        "lt": lambda a, b: a < b,
+        "lte": lambda a, b: a <= b,
+    }.get(op)
+    if compare is None:
+        raise PostgrestError(400, "PGRST100", f"operator '{op}' is not supported by the fake")
+
+    def test(row):
+        value = row.get(column)
+        return value is not None and compare(value, _coerce(raw, value))
+    return test
+
+
+def _logic(expression: str, combine) -> Callable[[dict], bool]:
+    """Parse the inside of `or(...)` / `and(...)` into one predicate."""
+    tests = []
+    for part in _split_top_level(expression):
+        if part.startswith(("and(", "or(")):
+            name, _, inner = part.partition("(")
+            tests.append(_logic(inner[:-1], all if name == "and" else any))
+        else:
+            column, _, rest = part.partition(".")
+            tests.append(_condition(column, rest))
+    return lambda row: combine(test(row) for test in tests)
+
+
+def _filters(request: Request) -> list:
+    tests = []
+    for key, value in request.query_params.multi_items():
+        if key == "or":
+            tests.append(_logic(_unwrap(value), any))
+        elif key not in _RESERVED_PARAMS:
+            tests.append(_condition(key, value))
+    return tests
+
+
+def _order_key(order: str):
+    terms = []
+    for term in order.split(","):
+        column, _, direction = term.partition(".")
+        terms.append((column, direction.startswith("desc")))
+
+    def sort(rows: list[dict]) -> list[dict]:
+        for column, descending in reversed(terms):
+            rows.sort(
+                key=lambda row: (row.get(column) is None, "" if row.get(column) is None else row.get(column)),
+                reverse=descending,
+            )
+        return rows
+    return sort
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Store
+# ─────────────────────────────────────────────────────────────────────────────
+
+class FakeDatabase:
+    """Tables are lists of dicts, with an index per unique key and per user."""
+
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = defaultdict(list)
+        self._unique: dict[str, dict[tuple, dict]] = defaultdict(dict)
+        self._by_user: dict[str, dict[str, list[dict]]] = defaultdict(lambda: defaultdict(list))
+        self.seed_categories()
+
+    def seed_categories(self) -> None:
+        names = [*json.loads(MAPPING_PATH.read_text(encoding="utf-8")), "Others"]
+        for name in names:
+            self.tables["categories"].append({"id": str(uuid.uuid4()), "name": name})
+
+    def _key(self, table: str, row: dict, columns: Optional[tuple] = None) -> Optional[tuple]:
+        columns = columns or UNIQUE_KEYS.get(table)
+        return tuple(row.get(col) for col in columns) if columns else None
+
+    def candidates(self, table: str, user_id: Optional[str]) -> list[dict]:
+        if user_id is not None and table != "categories":
+            return self._by_user[table].get(user_id, [])
+        return self.tables[table]
+
+    def insert(self, table: str, rows: list[dict], upsert_on: Optional[tuple] = None) -> list[dict]:
+        # Check the whole statement first: PostgREST inserts all rows or none.
+        seen = set()
+        for row in rows:
+            key = self._key(table, row, upsert_on)
+            if key is None:
+                continue
+            if key in seen or (not upsert_on and key in self._unique[table]):
+                raise PostgrestError(
+                    409, "23505", f'duplicate key value violates unique constraint "{table}_unique"'
+                )
+            seen.add(key)
+
+        now = datetime.now(timezone.utc).isoformat()
+        written = []
+        for row in rows:
+            key = self._key(table, row, upsert_on)
+            existing = self._unique[table].get(key) if upsert_on else None
+            if existing is not None:
+                existing.update(row)
+                written.append(existing)
+                continue
+            stored = {"id": str(uuid.uuid4()), "created_at": now, **row}
+            self.tables[table].append(stored)
+            if key is not None:
+                self._unique[table][key] = stored
+            if stored.get("user_id") is not None:
+                self._by_user[table][stored["user_id"]].append(stored)
+            written.append(stored)
+        return written
+
+    def rpc_merge_category_stats(self, p_user_id: str, p_import_id: str, p_rows: list[dict]) -> list[dict]:
+        """Same merge as backend/sql/category_stats.sql."""
+        if (p_user_id, p_import_id) in self._unique["category_stats_merges"]:
+            return []
+        self.insert("category_stats_merges", [{"user_id": p_user_id, "import_id": p_import_id}])
+        merged = []
+        for delta in p_rows:
+            key = (p_user_id, delta["category_id"], delta["month"])
+            row = self._unique["category_stats"].get(key)
+            if row is None:
+                row = self.insert("category_stats", [{"user_id": p_user_id, **delta}])[0]
+            else:
+                n_a, n_b = row.get("count") or 0, delta["count"]
+                mean_a = row.get("mean") or 0
+                diff = delta["mean"] - mean_a
+                row["count"] = n_a + n_b
+                row["total"] = (row.get("total") or 0) + delta["total"]
+                row["mean"] = mean_a + diff * n_b / (n_a + n_b)
+                row["m2"] = (row.get("m2") or 0) + delta["m2"] + diff * diff * n_a * n_b / (n_a + n_b)
+            merged.append(dict(row))
+        return merged
+
+    def embed(self, row: dict, resource: str, columns: list[str]) -> Optional[dict]:
+        target_id = row.get(FOREIGN_KEYS.get(resource, resource + "_id"))
+        for target in self.tables[resource]:
+            if target["id"] == target_id:
+                return _project(self, resource, target, columns)
+        return None
+
+
+def _project(db: FakeDatabase, table: str, row: dict, columns: list[str]) -> dict:
+    if not columns or columns == ["*"]:
+        return dict(row)
+    out = {}
+    for column in columns:
+        if column == "*":
+            out.update(row)
+        elif "(" in column:
+            resource, _, inner = column.partition("(")
+            out[resource] = db.embed(row, resource, _split_top_level(inner[:-1]))
+        else:
+            out[column] = row.get(column)
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# App
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _user_filter(request: Request) -> Optional[str]:
+    value = request.query_params.get("user_id", "")
+    return value[3:] if value.startswith("eq.") else None
+
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0) -> Starlette:
+    db = FakeDatabase()
+    stats = Counter()
+
+    async def delay() -> None:
+        seconds = (latency_ms + random.uniform(0, jitter_ms)) / 1000
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def table(request: Request) -> Response:
+        name = request.path_params["table"]
+        stats[f"{request.method} {name}"] += 1
+        await delay()
+        try:
+            if request.method in ("GET", "PATCH"):
+                rows = db.candidates(name, _user_filter(request))
+                tests = _filters(request)
+                rows = [row for row in rows if all(test(row) for test in tests)]
+                if request.method == "PATCH":
+                    changes = await request.json()
+                    for row in rows:
+                        row.update(changes)
+                    return JSONResponse(rows)
+                if "order" in request.query_params:
+                    rows = _order_key(request.query_params["order"])(rows)
+                offset = int(request.query_params.get("offset", 0))
+                limit = request.query_params.get("limit")
+                rows = rows[offset:offset + int(limit) if limit else None]
+                columns = _split_top_level(request.query_params.get("select", "*"))
+                return JSONResponse([_project(db, name, row, columns) for row in rows])
+
+            body = await request.json()
+            rows = body if isinstance(body, list) else [body]
+            prefer = request.headers.get("prefer", "")
+            upsert_on = None
+            if "resolution=merge-duplicates" in prefer:
+                on_conflict = request.query_params.get("on_conflict")
+                upsert_on = tuple(on_conflict.split(",")) if on_conflict else UNIQUE_KEYS.get(name, ("id",))
+            written = db.insert(name, rows, upsert_on)
+            if "return=minimal" in prefer:
+                return Response(status_code=201)
+            return JSONResponse(written, status_code=201)
+        except PostgrestError as e:
+            return JSONResponse(
+                {"code": e.code, "message": e.message, "details": None, "hint": None},
+                status_code=e.status_code,
+            )
+
+    async def rpc(request: Request) -> Response:
+        name = request.path_params["function"]
+        stats[f"POST rpc/{name}"] += 1
+        await delay()
+        function = getattr(db, f"rpc_{name}", None)
+        if function is None:
+            return JSONResponse(
+                {"code": "PGRST202", "message": f"Could not find the function {name}", "details": None, "hint": None},
+                status_code=404,
+            )
+        return JSONResponse(function(**await request.json()))
+
+    async def root(request: Request) -> Response:
+        stats[f"{request.method} /"] += 1
+        await delay()
+        return JSONResponse({})
+
+    async def jwks(request: Request) -> Response:
+        return JSONResponse({"keys": []})
+
+    async def stats_view(request: Request) -> Response:
+        return JSONResponse({
+            "requests": sum(stats.values()),
+            "by_route": dict(stats),
+            "rows": {name: len(rows) for name, rows in db.tables.items()},
+        })
+
+    app = Starlette(routes=[
+        Route("/rest/v1/", root, methods=["GET", "HEAD"]),
+        Route("/rest/v1/rpc/{function}", rpc, methods=["POST"]),
+        Route("/rest/v1/{table}", table, methods=["GET", "POST", "PATCH"]),
+        Route("/auth/v1/.well-known/jwks.json", jwks),
+        Route("/_stats", stats_view),
+    ])
+    app.state.db = db
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Synthetic Raiffeisen statements for load tests.
+
+Bookings are sampled from test_data.csv (so descriptions exercise the real
+category and enrichment rules) with fresh dates and amounts, which makes
+their import hashes unique unless a row is deliberately repeated.
+"""
+import csv
+import io
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+SAMPLE_PATH = Path(__file__).resolve().parents[1] / "test_data.csv"
+HEADER = ["IBAN", "Booked At", "Text", "Credit/Debit Amount", "Balance", "Valuta Date"]
+
+
+def load_templates(path: Path = SAMPLE_PATH) -> list[list[list[str]]]:
+    """Group the sample file into bookings: a main row plus its continuation rows."""
+    bookings = []
+    with open(path, newline="", encoding="latin1") as f:
+        reader = csv.reader(f, delimiter=";")
+        next(reader)
+        for row in reader:
+            row = (row + [""] * len(HEADER))[:len(HEADER)]
+            if row[0].strip():
+                bookings.append([row])
+            elif bookings:
+                bookings[-1].append(row)
+    return bookings
+
+
+class StatementGenerator:
+    """Produces CSV files for one virtual user; keeps its bookings for repeats."""
+
+    def __init__(self, templates: list[list[list[str]]], seed: int, year: int = 2025):
+        self.templates = templates
+        self.random = random.Random(seed)
+        self.year = year
+        self.iban = f"CH{self.random.randrange(10**19):019d}"
+        self.previous: list[list[list[str]]] = []
+
+    def _booking(self) -> list[list[str]]:
+        main, *rest = self.random.choice(self.templates)
+        day = date(self.year, 1, 1) + timedelta(days=self.random.randrange(365))
+        booked_at = f"{day.isoformat()} 00:00:00.0"
+        amount = round(self.random.uniform(1, 400), 2) * (-1 if self.random.random() < 0.85 else 1)
+        return [[self.iban, booked_at, main[2], f"{amount:.2f}", "", booked_at], *rest]
+
+    def statement(self, rows: int, duplicate_ratio: float = 0.0) -> bytes:
+        repeats = min(int(rows * duplicate_ratio), len(self.previous))
+        bookings = self.random.sample(self.previous, repeats)
+        bookings += [self._booking() for _ in range(rows - repeats)]
+        self.previous.extend(bookings[repeats:])
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
+        writer.writerow(HEADER)
+        for booking in bookings:
+            writer.writerows(booking)
+        return buffer.getvalue().encode("utf-8")
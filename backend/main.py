@@ -1,9 +1,41 @@
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import upload
+from app.services.supabase import get_http_client, load_env, pool_size, warm_up_connection
+
+load_env()
+
+from app.api.routes import alerts, export, tax_deductions, upload
+from app.services.admission import UploadAdmissionMiddleware
+from app.services.auth import SupabaseAuthMiddleware, warm_up_signing_keys
+from app.services.fx import get_fx_table
 import os
 
-app = FastAPI(title="bomboBank API", version="1.0.0")
+
+def warm_up() -> None:
+    """
+    Build per-process state the first upload would otherwise pay for.
+    (The category and enrichment patterns are compiled when the upload
+    route imports the parser.)
+    """
+    get_fx_table()
+    warm_up_connection()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Blocking handlers run in worker threads; never more than the pool has connections
+    to_thread.current_default_thread_limiter().total_tokens = pool_size()
+    # Instances scale to zero: do the slow one-time work before accepting traffic
+    await run_in_threadpool(warm_up)
+    await warm_up_signing_keys()
+    yield
+    get_http_client().close()
+
+
+app = FastAPI(title="bomboBank API", version="1.0.0", lifespan=lifespan)
 
 _raw_origins = os.getenv("ALLOWED_ORIGINS", "")
 allowed_origins = [o.strip() for o in _raw_origins.split(",") if o.strip()] or [
@@ -11,6 +43,11 @@ allowed_origins = [o.strip() for o in _raw_origins.split(",") if o.strip()] or [
     "https://bombobank.anghileri.ch",
 ]
 
+# Middlewares run outermost-last-added: CORS -> auth -> upload admission.
+# Admission needs the verified user; CORS answers preflights first.
+app.add_middleware(UploadAdmissionMiddleware, path_prefix="/api/upload/")
+app.add_middleware(SupabaseAuthMiddleware, protected_prefix="/api/")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -21,6 +58,9 @@ app.add_middleware(
 
 # Routes einbinden
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(alerts.router, prefix="/api/alerts", tags=["alerts"])
+app.include_router(tax_deductions.router, prefix="/api/tax-deductions", tags=["tax-deductions"])
 @app.get("/")
 def root():
     return {"message": "bomboBank API läuft! 🚀"}
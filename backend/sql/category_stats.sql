@@ -0,0 +1,52 @@
+-- Server-side merge for the import analytics in app/services/analytics.py.
+--
+-- Each import sends only its own samples per (category_id, month): count,
+-- total, mean and m2 (sum of squared deviations). merge_category_stats folds
+-- them into category_stats with the parallel variance formula (Chan et al.)
+-- inside one INSERT ... ON CONFLICT, which locks the row, so concurrent
+-- imports of the same user, on any number of API instances, never overwrite
+-- each other's updates. Calls are keyed by an import id: repeating one
+-- (e.g. after a timeout) changes nothing.
+--
+-- SECURITY INVOKER, so the RLS policies on both tables apply to the caller.
+
+create table if not exists category_stats_merges (
+    user_id uuid not null,
+    import_id uuid not null,
+    created_at timestamptz not null default now(),
+    primary key (user_id, import_id)
+);
+
+create or replace function merge_category_stats(p_user_id uuid, p_import_id uuid, p_rows jsonb)
+returns setof category_stats
+language plpgsql
+security invoker
+as $$
+begin
+    insert into category_stats_merges (user_id, import_id)
+    values (p_user_id, p_import_id)
+    on conflict do nothing;
+    if not found then
+        return;  -- this import was merged before
+    end if;
+
+    return query
+    with merged as (
+        insert into category_stats as s (user_id, category_id, month, count, total, mean, m2)
+        select p_user_id, d.category_id, d.month, d.count, d.total, d.mean, d.m2
+        from jsonb_populate_recordset(null::category_stats, p_rows) as d
+        on conflict (user_id, category_id, month) do update set
+            count = coalesce(s.count, 0) + excluded.count,
+            total = coalesce(s.total, 0) + excluded.total,
+            mean = coalesce(s.mean, 0)
+                + (excluded.mean - coalesce(s.mean, 0)) * excluded.count
+                / (coalesce(s.count, 0) + excluded.count),
+            m2 = coalesce(s.m2, 0) + excluded.m2
+                + (excluded.mean - coalesce(s.mean, 0)) ^ 2
+                * coalesce(s.count, 0) * excluded.count
+                / (coalesce(s.count, 0) + excluded.count)
+        returning s.*
+    )
+    select * from merged;
+end;
+$$;
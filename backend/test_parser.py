@@ -1,6 +1,6 @@
 import json
 import os
-from transaction_parser import TransactionParser # Passe den Pfad an, falls noetig
+from app.services.transaction_parser import TransactionParser # Passe den Pfad an, falls noetig
 
 # 1. Definiere den Dateinamen deiner CSV
 dateiname = "test_data.csv"
@@ -21,7 +21,7 @@ else:
         parsed_transactions = TransactionParser.parse_csv(csv_content_str)
         
         # 5. Ergebnis schön formatiert in der Konsole ausgeben
-        print(json.dumps(parsed_transactions, indent=4, ensure_ascii=False))
+        print(json.dumps([tx.to_dict() for tx in parsed_transactions], indent=4, ensure_ascii=False))
         
         print(f"\n✅ {len(parsed_transactions)} Transaktionen erfolgreich geparst!")
         
@@ -8,6 +8,7 @@ import {
     getSummary,
     getMonthlyAggregates,
     formatCHF,
+    amountCHF,
 } from "@/lib/types"
 import {
     TrendingDown,
@@ -119,7 +120,7 @@ export function Dashboard() {
                 month: "short",
                 year: "2-digit",
             })
-            byMonth[label] = (byMonth[label] ?? 0) + Math.abs(t.amount)
+            byMonth[label] = (byMonth[label] ?? 0) + Math.abs(amountCHF(t))
         }
 
         const monthly = Object.entries(byMonth)
@@ -132,7 +133,7 @@ export function Dashboard() {
             })
 
         const totalSpent = casinoTxs.reduce(
-            (s, t) => s + Math.abs(t.amount),
+            (s, t) => s + Math.abs(amountCHF(t)),
             0
         )
         const count = casinoTxs.length
@@ -153,7 +154,7 @@ export function Dashboard() {
             const name =
                 tx.merchant?.trim() || tx.description?.trim() || "Unknown"
             const arr = map.get(name) ?? []
-            arr.push(Math.abs(tx.amount))
+            arr.push(Math.abs(amountCHF(tx)))
             map.set(name, arr)
         }
         const rows = [...map.entries()]
@@ -1,5 +1,7 @@
 import { Badge } from "@/components/ui/badge"
 import { Card, CardContent } from "@/components/ui/card"
+import { Skeleton } from "@/components/ui/skeleton"
+import { useTaxDeductions, type DetectedDeduction } from "@/hooks/useTaxDeductions"
 import {
     Train,
     HeartPulse,
@@ -14,7 +16,7 @@ import {
     AlertCircle,
 } from "lucide-react"
 
-// ─── Mock Data ───────────────────────────────────────────────────────────────
+// ─── Deduction Config ────────────────────────────────────────────────────────
 
 interface DetectedMerchant {
     name: string
@@ -37,7 +39,12 @@ interface TaxDeduction {
     status: "confirmed" | "review" | "manual"
 }
 
-const DEDUCTIONS: TaxDeduction[] = [
+// Presentation and limits per deduction; detected amounts come from the backend
+// (GET /api/tax-deductions/{year}). Home office is not detectable from
+// transactions and stays a manual entry.
+type DeductionConfig = Omit<TaxDeduction, "detectedMerchants" | "totalDetected">
+
+const DEDUCTIONS: DeductionConfig[] = [
     {
         id: "transport",
         category: "Berufsfahrtkosten",
@@ -46,12 +53,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-blue-500",
         iconBg: "bg-blue-50 dark:bg-blue-950/40",
         iconColor: "text-blue-600 dark:text-blue-400",
-        detectedMerchants: [
-            { name: "SBB", amount: 2240 },
-            { name: "ZVV", amount: 420 },
-            { name: "PostAuto", amount: 140 },
-        ],
-        totalDetected: 2800,
         maxDeductible: 3000,
         estimatedTaxRate: 0.25,
         note: "Bundessteuer max. CHF 3'000. Kantonalsteuern oft unbegrenzt.",
@@ -65,12 +66,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-rose-500",
         iconBg: "bg-rose-50 dark:bg-rose-950/40",
         iconColor: "text-rose-600 dark:text-rose-400",
-        detectedMerchants: [
-            { name: "Apotheke Zur Rose", amount: 480 },
-            { name: "Praxis Dr. Müller", amount: 320 },
-            { name: "Helsana Selbstbehalt", amount: 700 },
-        ],
-        totalDetected: 1500,
         maxDeductible: null,
         estimatedTaxRate: 0.25,
         note: "Abzugsfähig soweit 5 % des Reineinkommens übersteigend.",
@@ -84,12 +79,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-violet-500",
         iconBg: "bg-violet-50 dark:bg-violet-950/40",
         iconColor: "text-violet-600 dark:text-violet-400",
-        detectedMerchants: [
-            { name: "Udemy", amount: 180 },
-            { name: "Coursera", amount: 240 },
-            { name: "Orell Füssli", amount: 95 },
-        ],
-        totalDetected: 515,
         maxDeductible: 12000,
         estimatedTaxRate: 0.25,
         note: "Bundessteuer max. CHF 12'000 pro Jahr (ab 2023).",
@@ -103,12 +92,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-pink-500",
         iconBg: "bg-pink-50 dark:bg-pink-950/40",
         iconColor: "text-pink-600 dark:text-pink-400",
-        detectedMerchants: [
-            { name: "Caritas Schweiz", amount: 200 },
-            { name: "SRK / Rotes Kreuz", amount: 150 },
-            { name: "WWF", amount: 100 },
-        ],
-        totalDetected: 450,
         maxDeductible: null,
         estimatedTaxRate: 0.25,
         note: "Max. 20 % des Nettoeinkommens. Mindestbetrag CHF 100.",
@@ -122,11 +105,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-amber-500",
         iconBg: "bg-amber-50 dark:bg-amber-950/40",
         iconColor: "text-amber-600 dark:text-amber-400",
-        detectedMerchants: [
-            { name: "Galaxus (Büromaterial)", amount: 320 },
-            { name: "IKEA (Büromöbel)", amount: 480 },
-        ],
-        totalDetected: 800,
         maxDeductible: null,
         estimatedTaxRate: 0.25,
         note: "Alternativabzug zu Berufsfahrtkosten – kann nicht kombiniert werden.",
@@ -140,11 +118,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-emerald-500",
         iconBg: "bg-emerald-50 dark:bg-emerald-950/40",
         iconColor: "text-emerald-600 dark:text-emerald-400",
-        detectedMerchants: [
-            { name: "VIAC Vorsorge", amount: 4000 },
-            { name: "Finpension", amount: 3056 },
-        ],
-        totalDetected: 7056,
         maxDeductible: 7056,
         estimatedTaxRate: 0.25,
         note: "Maximalbeitrag 2025 für Angestellte: CHF 7'056.",
@@ -158,11 +131,6 @@ const DEDUCTIONS: TaxDeduction[] = [
         accent: "border-l-sky-500",
         iconBg: "bg-sky-50 dark:bg-sky-950/40",
         iconColor: "text-sky-600 dark:text-sky-400",
-        detectedMerchants: [
-            { name: "Helsana", amount: 2640 },
-            { name: "CSS Versicherung", amount: 880 },
-        ],
-        totalDetected: 3520,
         maxDeductible: 3500,
         estimatedTaxRate: 0.25,
         note: "Pauschale: CHF 3'500 (verheiratet CHF 7'000) oder effektive Prämien.",
@@ -172,6 +140,20 @@ const DEDUCTIONS: TaxDeduction[] = [
 
 // ─── Helpers ─────────────────────────────────────────────────────────────────
 
+function withDetected(config: DeductionConfig[], detected: DetectedDeduction[]): TaxDeduction[] {
+    const byId = new Map(detected.map((d) => [d.id, d]))
+    return config.map((c) => {
+        const found = byId.get(c.id)
+        const status = c.status === "confirmed" && !found?.count ? "review" : c.status
+        return {
+            ...c,
+            status,
+            detectedMerchants: found?.merchants ?? [],
+            totalDetected: found?.total ?? 0,
+        }
+    })
+}
+
 function fmt(amount: number) {
     return new Intl.NumberFormat("de-CH", {
         style: "currency",
@@ -208,7 +190,7 @@ function StatusBadge({ status }: { status: TaxDeduction["status"] }) {
 function DeductionCard({ d }: { d: TaxDeduction }) {
     const effectiveMax = d.maxDeductible ?? d.totalDetected
     const capped = Math.min(d.totalDetected, effectiveMax)
-    const progress = Math.min((d.totalDetected / effectiveMax) * 100, 100)
+    const progress = effectiveMax > 0 ? Math.min((d.totalDetected / effectiveMax) * 100, 100) : 0
     const savings = Math.round(capped * d.estimatedTaxRate)
 
     return (
@@ -299,17 +281,53 @@ function DeductionCard({ d }: { d: TaxDeduction }) {
 // ─── Page ─────────────────────────────────────────────────────────────────────
 
 export function TaxDeductionsPage() {
-    const year = 2025
-    const totalDeductible = DEDUCTIONS.reduce(
+    const year = new Date().getFullYear() - 1
+    const { deductions: detected, loading, error } = useTaxDeductions(year)
+
+    if (loading) {
+        return (
+            <div className="space-y-8 p-8">
+                <div className="grid grid-cols-1 gap-4 sm:grid-cols-3">
+                    {[...Array(3)].map((_, i) => (
+                        <Card key={i}>
+                            <CardContent className="pt-6">
+                                <Skeleton className="h-4 w-24" />
+                                <Skeleton className="mt-2 h-8 w-32" />
+                            </CardContent>
+                        </Card>
+                    ))}
+                </div>
+                <div className="grid grid-cols-1 gap-4 lg:grid-cols-2 xl:grid-cols-3">
+                    {[...Array(3)].map((_, i) => (
+                        <Skeleton key={i} className="h-64 w-full rounded-lg" />
+                    ))}
+                </div>
+            </div>
+        )
+    }
+
+    if (error) {
+        return (
+            <div className="flex items-center justify-center p-16">
+                <div className="flex flex-col items-center gap-3 text-center">
+                    <AlertCircle className="size-8 text-destructive" />
+                    <p className="text-sm text-muted-foreground">{error}</p>
+                </div>
+            </div>
+        )
+    }
+
+    const deductions = withDetected(DEDUCTIONS, detected)
+    const totalDeductible = deductions.reduce(
         (sum, d) => sum + Math.min(d.totalDetected, d.maxDeductible ?? d.totalDetected),
         0
     )
-    const totalSavings = DEDUCTIONS.reduce((sum, d) => {
+    const totalSavings = deductions.reduce((sum, d) => {
         const capped = Math.min(d.totalDetected, d.maxDeductible ?? d.totalDetected)
         return sum + Math.round(capped * d.estimatedTaxRate)
     }, 0)
-    const confirmed = DEDUCTIONS.filter((d) => d.status === "confirmed").length
-    const toReview = DEDUCTIONS.filter((d) => d.status !== "confirmed").length
+    const confirmed = deductions.filter((d) => d.status === "confirmed").length
+    const toReview = deductions.filter((d) => d.status !== "confirmed").length
 
     return (
         <div className="space-y-8 p-8">
@@ -318,9 +336,9 @@ export function TaxDeductionsPage() {
             <div className="flex items-start gap-3 rounded-lg border bg-muted/40 px-4 py-3">
                 <Info className="mt-0.5 size-4 shrink-0 text-muted-foreground" />
                 <p className="text-sm text-muted-foreground">
-                    <span className="font-medium text-foreground">Demo-Daten – </span>
-                    Die Beträge basieren auf simulierten Transaktionen. Für eine verbindliche
-                    Steuerberechnung konsultiere eine Fachperson.
+                    <span className="font-medium text-foreground">Ohne Gewähr – </span>
+                    Die Beträge werden automatisch aus deinen importierten Transaktionen erkannt.
+                    Für eine verbindliche Steuerberechnung konsultiere eine Fachperson.
                 </p>
             </div>
 
@@ -333,7 +351,7 @@ export function TaxDeductionsPage() {
                         </p>
                         <p className="mt-1 text-3xl font-bold tabular-nums">{fmt(totalDeductible)}</p>
                         <p className="mt-1 text-xs text-muted-foreground">
-                            aus {DEDUCTIONS.length} Kategorien
+                            aus {deductions.length} Kategorien
                         </p>
                     </CardContent>
                 </Card>
@@ -377,7 +395,7 @@ export function TaxDeductionsPage() {
                     Erkannte Abzüge
                 </h2>
                 <div className="grid grid-cols-1 gap-4 lg:grid-cols-2 xl:grid-cols-3">
-                    {DEDUCTIONS.map((d) => (
+                    {deductions.map((d) => (
                         <DeductionCard key={d.id} d={d} />
                     ))}
                 </div>
@@ -13,7 +13,7 @@ import {
     TableRow,
 } from "@/components/ui/table"
 import { useTransactions } from "@/hooks/useTransactions"
-import { getCategoryName, getCategoryColor, formatCHF } from "@/lib/types"
+import { getCategoryName, getCategoryColor, formatCHF, amountCHF } from "@/lib/types"
 import {
     Search,
     AlertCircle,
@@ -156,7 +156,7 @@ export function TransactionsPage() {
                     cmp = a.booked_at.localeCompare(b.booked_at)
                     break
                 case "amount":
-                    cmp = a.amount - b.amount
+                    cmp = amountCHF(a) - amountCHF(b)
                     break
                 case "merchant":
                     cmp = (a.merchant ?? "").localeCompare(b.merchant ?? "")
@@ -414,7 +414,7 @@ export function TransactionsPage() {
                                                 <TableCell className="text-right tabular-nums font-semibold">
                                                     <span className={tx.amount > 0 ? "text-emerald-600" : "text-foreground"}>
                                                         {tx.amount > 0 ? "+" : ""}
-                                                        {formatCHF(tx.amount)}
+                                                        {formatCHF(amountCHF(tx))}
                                                     </span>
                                                 </TableCell>
                                             </TableRow>
@@ -0,0 +1,65 @@
+import { useEffect, useState } from "react"
+import supabase from "@/utils/supabase"
+import { useAuth } from "@/contexts/AuthContext"
+
+export interface DetectedDeduction {
+    id: string
+    total: number
+    count: number
+    merchants: { name: string; amount: number }[]
+}
+
+interface UseTaxDeductionsResult {
+    deductions: DetectedDeduction[]
+    updatedAt: string | null
+    loading: boolean
+    error: string | null
+    refetch: () => void
+}
+
+/** Deduction candidates for one tax year, computed by the backend. */
+export function useTaxDeductions(year: number): UseTaxDeductionsResult {
+    const { user } = useAuth()
+    const [deductions, setDeductions] = useState<DetectedDeduction[]>([])
+    const [updatedAt, setUpdatedAt] = useState<string | null>(null)
+    const [loading, setLoading] = useState(true)
+    const [error, setError] = useState<string | null>(null)
+
+    async function fetchSummary() {
+        if (!user) return
+
+        setLoading(true)
+        setError(null)
+
+        try {
+            const { data: { session } } = await supabase.auth.getSession()
+            const token = session?.access_token ?? ""
+
+            const apiBase = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000"
+            const response = await fetch(`${apiBase}/api/tax-deductions/${year}`, {
+                headers: { Authorization: `Bearer ${token}` },
+            })
+
+            if (!response.ok) {
+                const err = await response.json().catch(() => null)
+                throw new Error(err?.detail ?? `Server error: ${response.status}`)
+            }
+
+            const data = await response.json()
+            setDeductions(data.deductions ?? [])
+            setUpdatedAt(data.updated_at ?? null)
+        } catch (err) {
+            const message =
+                err instanceof Error ? err.message : "Failed to load tax deductions"
+            setError(message)
+        } finally {
+            setLoading(false)
+        }
+    }
+
+    useEffect(() => {
+        fetchSummary()
+    }, [year, user?.id])
+
+    return { deductions, updatedAt, loading, error, refetch: fetchSummary }
+}
@@ -24,6 +24,13 @@ export interface DbTransaction {
     created_at: string
     merchant: string | null
     raw_text: string | null
+    /** e.g. "twint", "card", "transfer", "direct_debit", "standing_order" */
+    payment_method: string | null
+    counterparty: string | null
+    direction: "in" | "out" | null
+    /** `amount` converted to CHF at the booking-date rate (null if no rate) */
+    amount_chf: number | null
+    fx_rate: number | null
     categories: Pick<DbCategory, "name" | "icon" | "color"> | null
 }
 
@@ -36,6 +43,11 @@ export function formatCHF(amount: number) {
     }).format(amount)
 }
 
+/** Amount in CHF; falls back to the raw amount when no FX rate was available. */
+export function amountCHF(tx: DbTransaction): number {
+    return tx.amount_chf ?? tx.amount
+}
+
 export function getCategoryName(tx: DbTransaction): string {
     return tx.categories?.name ?? "Unassigned"
 }
@@ -76,13 +88,13 @@ export function getSummary(
 
     const totalIncome = data
         .filter((t) => t.amount > 0)
-        .reduce((sum, t) => sum + t.amount, 0)
+        .reduce((sum, t) => sum + amountCHF(t), 0)
 
     const totalExpenses = expenses
         .filter((t) => getCategoryName(t) !== "Unassigned")
-        .reduce((sum, t) => sum + Math.abs(t.amount), 0)
+        .reduce((sum, t) => sum + Math.abs(amountCHF(t)), 0)
 
-    const totalOut = expenses.reduce((sum, t) => sum + Math.abs(t.amount), 0)
+    const totalOut = expenses.reduce((sum, t) => sum + Math.abs(amountCHF(t)), 0)
 
     // Compute days elapsed within the period for burn-rate
     let daysElapsed: number
@@ -114,7 +126,7 @@ export function getSummary(
         .reduce(
             (acc, t) => {
                 const cat = getCategoryName(t)
-                acc[cat] = (acc[cat] || 0) + Math.abs(t.amount)
+                acc[cat] = (acc[cat] || 0) + Math.abs(amountCHF(t))
                 if (!(cat in categoryColors)) {
                     categoryColors[cat] = getCategoryColor(t)
                 }
@@ -168,9 +180,9 @@ export function getMonthlyAggregates(
         const key = tx.booked_at.slice(0, 7) // "YYYY-MM"
         const entry = map.get(key) ?? { income: 0, expense: 0 }
         if (tx.amount > 0) {
-            entry.income += tx.amount
+            entry.income += amountCHF(tx)
         } else {
-            entry.expense += Math.abs(tx.amount)
+            entry.expense += Math.abs(amountCHF(tx))
         }
         map.set(key, entry)
     }
@@ -253,7 +265,7 @@ export function getRecurringPayments(data: DbTransaction[]): RecurringPayment[]
         const entry = map.get(key)
         if (entry) {
             entry.months.add(month)
-            entry.totalPaid += Math.abs(tx.amount)
+            entry.totalPaid += Math.abs(amountCHF(tx))
             if (tx.booked_at > entry.latestDate) entry.latestDate = tx.booked_at
         } else {
             const catName = getCategoryName(tx)
@@ -261,7 +273,7 @@ export function getRecurringPayments(data: DbTransaction[]): RecurringPayment[]
                 description: rawDesc,
                 amount: amt,
                 months: new Set([month]),
-                totalPaid: Math.abs(tx.amount),
+                totalPaid: Math.abs(amountCHF(tx)),
                 category: catName !== "Unassigned" ? catName : null,
                 categoryColor: getCategoryColor(tx),
                 latestDate: tx.booked_at,
@@ -307,7 +319,7 @@ export function getMerchantStats(data: DbTransaction[]): MerchantStat[] {
         if (tx.amount >= 0) continue // only expenses
         const name = tx.merchant?.trim() || tx.description?.trim() || "Unknown"
         const entry = map.get(name) ?? { total: 0, count: 0 }
-        entry.total += Math.abs(tx.amount)
+        entry.total += Math.abs(amountCHF(tx))
         entry.count += 1
         map.set(name, entry)
     }